@@ -0,0 +1,21 @@
+"""API routes for fleet-wide analytics."""
+
+from fastapi import APIRouter, Query
+
+from app.services import analytics_service, onboarding_service
+
+router = APIRouter(prefix="/api/analytics", tags=["analytics"])
+
+
+@router.get("/summary")
+def get_summary(top: int = Query(default=10, ge=1, description="Number of most common formulas")):
+    """Return materialized fleet-wide aggregates."""
+    if not analytics_service.is_built():
+        onboarding_service.rebuild_analytics()
+    return analytics_service.get_summary(top)
+
+
+@router.post("/rebuild")
+def rebuild():
+    """Recompute aggregates from all submissions and report drift."""
+    return onboarding_service.rebuild_analytics()
@@ -1,6 +1,10 @@
 """API routes for final onboarding submission."""
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Header, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import JSONResponse
+from pydantic import ValidationError
 
 from app.models.schemas import OnboardingPayload
 from app.services import onboarding_service
@@ -8,15 +12,70 @@ from app.services import onboarding_service
 router = APIRouter(prefix="/api", tags=["onboarding"])
 
 
-@router.post("/onboarding")
-def submit_onboarding(payload: OnboardingPayload):
-    """Accept, validate, and save the complete onboarding configuration."""
+def _inline_refs(schema: dict) -> dict:
+    """Return a model's JSON schema with its local ``$defs`` references inlined."""
+    defs = schema.pop("$defs", {})
+
+    def resolve(node):
+        if isinstance(node, dict):
+            resolved = {k: resolve(v) for k, v in node.items() if k != "$ref"}
+            if "$ref" in node:
+                return {**resolve(defs[node["$ref"].rsplit("/", 1)[-1]]), **resolved}
+            return resolved
+        if isinstance(node, list):
+            return [resolve(v) for v in node]
+        return node
+
+    return resolve(schema)
+
+
+# The endpoint reads the raw body itself, so describe it for the OpenAPI docs.
+_PAYLOAD_BODY = {
+    "requestBody": {
+        "content": {"application/json": {"schema": _inline_refs(OnboardingPayload.model_json_schema())}},
+        "required": True,
+    },
+}
+
+
+def _expected_hash(if_match: str | None) -> str | None:
+    """Reduce an If-Match header to a bare content hash, or ``*``."""
+    if not if_match:
+        return None
+    tag = if_match.strip()
+    if tag.startswith("W/"):
+        tag = tag[2:]
+    return tag.strip('"')
+
+
+def _submit(payload: OnboardingPayload, if_match: str | None) -> JSONResponse:
     try:
-        result = onboarding_service.validate_payload(payload.model_dump())
-        meta = onboarding_service.save_submission(result)
-        return {**result, "submission": meta}
+        result = onboarding_service.validate_onboarding(payload)
+        expected = _expected_hash(if_match)
+        meta = onboarding_service.save_submission(result, expected_hash=expected)
+    except onboarding_service.StaleSubmissionError as e:
+        raise HTTPException(status_code=412, detail=str(e))
     except ValueError as e:
         raise HTTPException(status_code=422, detail=str(e))
+    # result is already JSON-ready, so skip FastAPI's response re-encoding.
+    return JSONResponse({**result, "submission": meta})
+
+
+@router.post("/onboarding", openapi_extra=_PAYLOAD_BODY)
+async def submit_onboarding(
+    request: Request,
+    if_match: str | None = Header(default=None, description="ETag the client last saw, or * to require an existing submission"),
+):
+    """Accept, validate, and save the complete onboarding configuration.
+
+    The raw body is validated in one pass with pydantic's JSON validator
+    instead of being decoded to dicts and converted back and forth.
+    """
+    try:
+        payload = onboarding_service.parse_payload(await request.body())
+    except ValidationError as e:
+        raise RequestValidationError([{**err, "loc": ("body", *err["loc"])} for err in e.errors(include_url=False)])
+    return await run_in_threadpool(_submit, payload, if_match)
 
 
 @router.get("/submissions")
@@ -25,12 +84,35 @@ def list_submissions():
     return onboarding_service.list_submissions()
 
 
+@router.get("/submissions/search")
+def search_submissions(
+    q: str = Query(..., description="Text to find in plant name, address, manager email or asset names"),
+    limit: int = Query(default=20, ge=1, le=200),
+):
+    """Full-text search over submissions, best match first."""
+    try:
+        return onboarding_service.search_submissions(q, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+
 @router.get("/submissions/{submission_id}")
-def get_submission(submission_id: str):
-    """Load a single submission by ID."""
-    record = onboarding_service.get_submission(submission_id)
+def get_submission(
+    submission_id: str,
+    response: Response,
+    fields: str = Query(default="", description="Comma-separated sections to return, e.g. plant,assets"),
+):
+    """Load a single submission by ID, optionally projected to some sections."""
+    try:
+        selected = onboarding_service.parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    record = onboarding_service.get_submission(submission_id, selected)
     if not record:
         raise HTTPException(status_code=404, detail="Submission not found")
+    # The hash covers the whole record, so a projection gets no ETag.
+    if selected == onboarding_service.FIELDS:
+        response.headers["ETag"] = f'"{record["content_hash"]}"'
     return record
 
 
@@ -0,0 +1,73 @@
+"""API routes for ingesting and querying parameter readings."""
+
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import JSONResponse
+
+from app.models.schemas import ReadingsBatch
+from app.services import onboarding_service, readings_service, unit_service
+
+router = APIRouter(prefix="/api/readings", tags=["readings"])
+
+
+def _enabled_parameters(submission_id: str) -> dict[str, str]:
+    """Map a submission's enabled parameter names to their units, or raise 404."""
+    record = onboarding_service.get_submission(submission_id, ("parameters",))
+    if not record:
+        raise HTTPException(status_code=404, detail="Submission not found")
+    return {p["name"]: p.get("unit", "") for p in record["data"]["parameters"] if p.get("enabled", True)}
+
+
+@router.get("/{submission_id}")
+def list_series(submission_id: str):
+    """List parameters that have stored readings for a plant."""
+    _enabled_parameters(submission_id)
+    return readings_service.list_series(submission_id)
+
+
+@router.post("/{submission_id}/{parameter}")
+def append_readings(submission_id: str, parameter: str, batch: ReadingsBatch):
+    """Append a batch of readings, converting to the plant's configured unit if needed."""
+    enabled = _enabled_parameters(submission_id)
+    if parameter not in enabled:
+        raise HTTPException(status_code=404, detail=f"Parameter '{parameter}' is not enabled for this plant")
+    try:
+        values = batch.values
+        if batch.unit and batch.unit != enabled[parameter]:
+            values = unit_service.convert(parameter, values, batch.unit, enabled[parameter])
+        return readings_service.append_readings(submission_id, parameter, batch.timestamps, values)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+
+@router.get("/{submission_id}/{parameter}")
+def read_range(
+    submission_id: str,
+    parameter: str,
+    start: int | None = Query(default=None, description="Inclusive start, epoch milliseconds"),
+    end: int | None = Query(default=None, description="Exclusive end, epoch milliseconds"),
+    limit: int = Query(default=100_000, ge=1, le=1_000_000, description="Maximum readings to return"),
+):
+    """Return readings for one parameter within a time range.
+
+    About ``limit`` readings are returned per page; a page may run longer
+    only to include every reading at one timestamp. When more remain,
+    ``next_start`` is the timestamp to pass as ``start`` for the next page.
+    """
+    enabled = _enabled_parameters(submission_id)
+    if parameter not in enabled:
+        raise HTTPException(status_code=404, detail=f"Parameter '{parameter}' is not enabled for this plant")
+    try:
+        timestamps, values = readings_service.read_range(submission_id, parameter, start, end)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    timestamps, values, next_start = readings_service.page(timestamps, values, limit)
+    # Plain lists go straight to JSONResponse; FastAPI's encoder would walk
+    # every element again.
+    return JSONResponse({
+        "parameter": parameter,
+        "unit": enabled[parameter],
+        "count": int(timestamps.size),
+        "next_start": next_start,
+        "timestamps": timestamps.tolist(),
+        "values": values.tolist(),
+    })
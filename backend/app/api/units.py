@@ -0,0 +1,39 @@
+"""API routes for registry unit conversion."""
+
+from fastapi import APIRouter, HTTPException
+
+from app.models.schemas import UnitConversionRequest
+from app.services import unit_service
+
+router = APIRouter(prefix="/api/units", tags=["units"])
+
+
+@router.post("/convert")
+def convert_values(request: UnitConversionRequest):
+    """Convert a batch of values between two units of a parameter."""
+    try:
+        converted = unit_service.convert(request.parameter, request.values, request.from_unit, request.to_unit)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    table = unit_service.get_conversion_table(request.parameter)
+    return {
+        "parameter": request.parameter,
+        "unit": request.to_unit or table["unit"],
+        "values": converted.tolist(),
+    }
+
+
+@router.get("/{parameter}")
+def get_conversion_table(parameter: str):
+    """Return the precomputed conversion factors for a parameter."""
+    table = unit_service.get_conversion_table(parameter)
+    if table is None:
+        raise HTTPException(status_code=404, detail=f"Parameter '{parameter}' not found")
+    return {
+        "parameter": parameter,
+        "unit": table["unit"],
+        "conversions": [
+            {"from": src, "to": dst, "scale": a, "offset": b}
+            for (src, dst), (a, b) in table["factors"].items()
+        ],
+    }
@@ -1,11 +1,14 @@
 """FastAPI application entry point for the LatSpace onboarding wizard."""
 
 import logging
+import os
+from pathlib import Path
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.api import parameters, formulas, onboarding, templates
+from app.api import parameters, formulas, onboarding, templates, analytics, readings, units
+from app.utils.profiling import ProfilingMiddleware
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
 
@@ -22,10 +25,26 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-request profiling is opt-in: the middleware is only installed when an
+# admin token or a sampling rate is configured.
+PROFILE_TOKEN = os.environ.get("PROFILE_TOKEN") or None
+PROFILE_SAMPLE_RATE = float(os.environ.get("PROFILE_SAMPLE_RATE", "0"))
+if PROFILE_TOKEN or PROFILE_SAMPLE_RATE > 0:
+    app.add_middleware(
+        ProfilingMiddleware,
+        output_dir=Path(os.environ.get("PROFILE_DIR", Path(__file__).parent / "data" / "profiles")),
+        token=PROFILE_TOKEN,
+        sample_rate=PROFILE_SAMPLE_RATE,
+        interval=float(os.environ.get("PROFILE_INTERVAL_MS", "1")) / 1000,
+    )
+
 app.include_router(parameters.router)
 app.include_router(formulas.router)
 app.include_router(onboarding.router)
 app.include_router(templates.router)
+app.include_router(analytics.router)
+app.include_router(readings.router)
+app.include_router(units.router)
 
 
 @app.get("/api/health")
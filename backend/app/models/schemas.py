@@ -96,6 +96,21 @@ class OnboardingPayload(BaseModel):
     formulas: list[FormulaEntry] = Field(default_factory=list)
 
 
+class ReadingsBatch(BaseModel):
+    """A batch of time-series readings for one enabled parameter."""
+    timestamps: list[int] = Field(..., description="Epoch milliseconds, non-decreasing")
+    values: list[float]
+    unit: Optional[str] = Field(default=None, description="Unit of values if not the plant's configured unit")
+
+
+class UnitConversionRequest(BaseModel):
+    """Request body for POST /api/units/convert."""
+    parameter: str = Field(..., min_length=1)
+    values: list[float]
+    from_unit: str = Field(..., min_length=1)
+    to_unit: Optional[str] = None
+
+
 class TemplatePayload(BaseModel):
     """Payload for saving/loading templates."""
     name: str = Field(..., min_length=1)
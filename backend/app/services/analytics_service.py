@@ -0,0 +1,164 @@
+"""Materialized fleet-wide aggregates over saved submissions.
+
+Counters are updated incrementally on every save and delete, so reading the
+summary costs the same whatever the number of plants.
+"""
+
+import json
+import logging
+import os
+import tempfile
+import threading
+from collections.abc import Iterable
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+ANALYTICS_PATH = Path(__file__).resolve().parent.parent / "data" / "analytics.json"
+
+_COUNTERS = ("asset_types", "parameters", "formulas", "templates")
+
+_summary_cache: dict | None = None
+_lock = threading.Lock()
+
+
+def _empty() -> dict:
+    return {"plants": 0, **{name: {} for name in _COUNTERS}}
+
+
+def _read() -> dict | None:
+    """Read aggregates from disk; None if missing or unreadable."""
+    try:
+        with open(ANALYTICS_PATH, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+    except json.JSONDecodeError as e:
+        logger.warning("Analytics file unreadable, will rebuild: %s", e)
+        return None
+
+
+def _load() -> dict:
+    """Load aggregates from disk, caching on first call."""
+    global _summary_cache
+    if _summary_cache is None:
+        _summary_cache = _read() or _empty()
+    return _summary_cache
+
+
+def _persist(aggregates: dict) -> None:
+    ANALYTICS_PATH.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=ANALYTICS_PATH.parent, prefix=f".{ANALYTICS_PATH.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(aggregates, f, indent=2)
+        os.replace(tmp, ANALYTICS_PATH)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def contribution(data: dict) -> dict:
+    """Compute what a single submission's data adds to the aggregates.
+
+    Args:
+        data: The ``data`` block of a submission record. Only the
+              template_name, assets, parameters and formulas keys are used.
+
+    Returns:
+        Dict mapping each counter name to the set of keys this plant counts
+        towards (each plant counts at most once per key).
+    """
+    template = data.get("template_name") or ""
+    return {
+        "asset_types": {getattr(a["type"], "value", a["type"]) for a in data.get("assets", [])},
+        "parameters": {p["name"] for p in data.get("parameters", []) if p.get("enabled", True)},
+        "formulas": {f["expression"].strip() for f in data.get("formulas", []) if f.get("expression", "").strip()},
+        "templates": {template} if template else set(),
+    }
+
+
+def _apply(aggregates: dict, data: dict, sign: int) -> None:
+    aggregates["plants"] += sign
+    for counter, keys in contribution(data).items():
+        counts = aggregates[counter]
+        for key in keys:
+            value = counts.get(key, 0) + sign
+            if value > 0:
+                counts[key] = value
+            else:
+                counts.pop(key, None)
+
+
+def is_built() -> bool:
+    """Return True if readable materialized aggregates exist.
+
+    A missing or corrupt file counts as not built, so callers rebuild from
+    the submissions rather than counting on from zero.
+    """
+    global _summary_cache
+    with _lock:
+        if _summary_cache is None:
+            _summary_cache = _read()
+        return _summary_cache is not None
+
+
+def update(old_data: dict | None, new_data: dict | None) -> None:
+    """Replace one submission's contribution with another.
+
+    Args:
+        old_data: Data of the record being replaced or deleted, if any.
+        new_data: Data of the record being written, or None on delete.
+    """
+    with _lock:
+        aggregates = _load()
+        if old_data is not None:
+            _apply(aggregates, old_data, -1)
+        if new_data is not None:
+            _apply(aggregates, new_data, 1)
+        _persist(aggregates)
+
+
+def rebuild(records: Iterable[dict]) -> dict:
+    """Recompute the aggregates from scratch.
+
+    Args:
+        records: Data blocks of every saved submission.
+
+    Returns:
+        Dict with the fresh summary and whether it matched the
+        incrementally maintained aggregates.
+    """
+    global _summary_cache
+    fresh = _empty()
+    for data in records:
+        _apply(fresh, data, 1)
+    with _lock:
+        previous = _summary_cache if _summary_cache is not None else _read()
+        consistent = previous == fresh
+        _summary_cache = fresh
+        _persist(fresh)
+    logger.info("Analytics rebuilt: plants=%d, consistent=%s", fresh["plants"], consistent)
+    return {"consistent": consistent, "summary": get_summary()}
+
+
+def get_summary(top: int = 10) -> dict:
+    """Return the fleet-wide summary.
+
+    Args:
+        top: Number of most common formulas to include.
+
+    Returns:
+        Dict with plant counts per asset type, parameter enablement counts,
+        the most common formulas and template usage.
+    """
+    with _lock:
+        aggregates = _load()
+        formulas = sorted(aggregates["formulas"].items(), key=lambda kv: (-kv[1], kv[0]))[:top]
+        return {
+            "total_plants": aggregates["plants"],
+            "plants_per_asset_type": dict(aggregates["asset_types"]),
+            "parameter_enabled_counts": dict(aggregates["parameters"]),
+            "top_formulas": [{"expression": expr, "count": count} for expr, count in formulas],
+            "template_usage": dict(aggregates["templates"]),
+        }
@@ -1,10 +1,19 @@
 """Service for processing and validating the final onboarding payload."""
 
+import hashlib
 import json
 import logging
+import os
+import shutil
+import tempfile
+import threading
 from datetime import datetime, timezone
 from pathlib import Path
 
+from pydantic import TypeAdapter
+
+from app.models.schemas import OnboardingPayload
+from app.services import analytics_service, readings_service, search_service
 from app.services.formula_service import extract_identifiers
 from app.utils.validators import check_duplicate_assets
 
@@ -12,25 +21,182 @@ logger = logging.getLogger(__name__)
 
 SUBMISSIONS_DIR = Path(__file__).resolve().parent.parent / "data" / "submissions"
 
+# Each submission is a directory with a small metadata file plus one file per
+# data section, so a single section can be read without parsing the others.
+META_FILE = "record.json"
+SECTIONS = ("plant", "assets", "parameters", "formulas")
+FIELDS = ("plant", "template_name", "assets", "parameters", "formulas")
+_ANALYTICS_FIELDS = ("template_name", "assets", "parameters", "formulas")
+_SEARCH_FIELDS = ("plant", "assets")
+
+# Built once; validating raw JSON through it skips the intermediate dict.
+_PAYLOAD_ADAPTER = TypeAdapter(OnboardingPayload)
+
+# Serializes writers: an upsert or delete reads the old record, rewrites the
+# files and updates the aggregates as one step. Reentrant because writers
+# build missing aggregates through the rebuild functions, which also take it.
+_lock = threading.RLock()
+
+
+class StaleSubmissionError(Exception):
+    """Raised when a conditional submit's expected hash does not match."""
+
 
 def _ensure_dir():
     SUBMISSIONS_DIR.mkdir(parents=True, exist_ok=True)
+    _migrate_legacy_files()
+
+
+def _read_json(path: Path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _write_json(path: Path, data) -> None:
+    """Write JSON to a temp file beside ``path`` and swap it into place."""
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2, default=str)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def _write_record(record_dir: Path, record: dict) -> None:
+    """Write a record as a metadata file plus one file per data section.
+
+    Every file is replaced atomically and the metadata file goes last, so a
+    new record is not found by lookups until all its sections exist.
+    """
+    record_dir.mkdir(parents=True, exist_ok=True)
+    data = record.get("data", {})
+    for section in SECTIONS:
+        _write_json(record_dir / f"{section}.json", data.get(section, {} if section == "plant" else []))
+    _write_json(record_dir / META_FILE, {k: v for k, v in record.items() if k != "data"})
+
+
+def _read_record(record_dir: Path, fields: tuple[str, ...] = FIELDS) -> dict:
+    """Read the metadata file and only the requested data sections."""
+    record = _read_json(record_dir / META_FILE)
+    data = {}
+    for field in fields:
+        if field == "template_name":
+            data[field] = record.get("template_name", "")
+        else:
+            data[field] = _read_json(record_dir / f"{field}.json")
+    record["data"] = data
+    return record
+
+
+def _migrate_legacy_files():
+    """Convert flat ``<id>_<plant>.json`` files into the sectioned layout."""
+    for path in SUBMISSIONS_DIR.glob("*.json"):
+        try:
+            record = _read_json(path)
+        except json.JSONDecodeError:
+            continue
+        _write_record(SUBMISSIONS_DIR / path.stem, record)
+        path.unlink()
+        logger.info("Submission migrated to sectioned layout: %s", path.stem)
 
 
 def _find_by_plant_name(plant_name: str) -> Path | None:
-    """Find an existing submission file by plant name."""
+    """Find an existing submission directory by plant name."""
     _ensure_dir()
-    for path in SUBMISSIONS_DIR.glob("*.json"):
+    for path in SUBMISSIONS_DIR.glob(f"*/{META_FILE}"):
         try:
-            with open(path, "r", encoding="utf-8") as f:
-                record = json.load(f)
+            record = _read_json(path)
             if record.get("plant_name", "").lower() == plant_name.lower():
-                return path
+                return path.parent
         except (json.JSONDecodeError, KeyError):
             continue
     return None
 
 
+def content_hash(validated_payload: dict) -> str:
+    """Return a SHA-256 hash of the payload's canonical JSON form."""
+    canonical = json.dumps(validated_payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def _find_by_id(submission_id: str) -> Path | None:
+    """Find a submission directory whose metadata has exactly this ID."""
+    _ensure_dir()
+    for path in SUBMISSIONS_DIR.glob(f"{submission_id}_*/{META_FILE}"):
+        try:
+            if _read_json(path).get("id") == submission_id:
+                return path.parent
+        except json.JSONDecodeError:
+            continue
+    return None
+
+
+def _iter_records(fields: tuple[str, ...]):
+    """Yield every saved record with the given sections, skipping unreadable ones."""
+    for path in SUBMISSIONS_DIR.glob(f"*/{META_FILE}"):
+        try:
+            yield _read_record(path.parent, fields)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning("Skipping unreadable submission %s: %s", path.parent.name, e)
+
+
+def _ensure_analytics():
+    """Build the fleet aggregates from existing records if they are missing."""
+    if not analytics_service.is_built():
+        rebuild_analytics()
+
+
+def rebuild_analytics() -> dict:
+    """Recompute fleet aggregates from every saved submission."""
+    with _lock:
+        _ensure_dir()
+        records = (record["data"] for record in _iter_records(_ANALYTICS_FIELDS))
+        return analytics_service.rebuild(records)
+
+
+def _ensure_search_index():
+    """Build the search index from existing records if it is missing."""
+    if not search_service.is_built():
+        rebuild_search_index()
+
+
+def rebuild_search_index() -> int:
+    """Re-index every saved submission for full-text search."""
+    with _lock:
+        _ensure_dir()
+        return search_service.rebuild(_iter_records(_SEARCH_FIELDS))
+
+
+def search_submissions(q: str, limit: int = 20) -> list[dict]:
+    """Full-text search over plant name, address, manager email and assets."""
+    _ensure_search_index()
+    return search_service.search(q, limit)
+
+
+def parse_fields(fields: str) -> tuple[str, ...]:
+    """Parse a comma-separated field projection.
+
+    Args:
+        fields: Comma-separated section names like "plant,assets".
+                Empty means every section.
+
+    Returns:
+        Tuple of requested field names in canonical order.
+
+    Raises:
+        ValueError: If an unknown field is requested.
+    """
+    requested = {f.strip() for f in fields.split(",") if f.strip()}
+    if not requested:
+        return FIELDS
+    unknown = requested - set(FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    return tuple(f for f in FIELDS if f in requested)
+
+
 def validate_payload(payload: dict) -> dict:
     """Validate and enrich the complete onboarding payload."""
     assets = payload.get("assets", [])
@@ -78,83 +244,176 @@ def validate_payload(payload: dict) -> dict:
     return result
 
 
-def save_submission(validated_payload: dict) -> dict:
-    """Save or update a submission. Same plant name = same submission (upsert)."""
-    _ensure_dir()
-    plant_name = validated_payload.get("plant", {}).get("name", "unknown")
-    now = datetime.now(timezone.utc)
-
-    existing_path = _find_by_plant_name(plant_name)
-
-    if existing_path:
-        with open(existing_path, "r", encoding="utf-8") as f:
-            old_record = json.load(f)
-        submission_id = old_record.get("id")
-        record = {
-            "id": submission_id,
-            "submitted_at": old_record.get("submitted_at"),
-            "updated_at": now.isoformat(),
-            "plant_name": plant_name,
-            "template_name": validated_payload.get("template_name", ""),
-            "data": validated_payload,
-        }
-        with open(existing_path, "w", encoding="utf-8") as f:
-            json.dump(record, f, indent=2, default=str)
-        logger.info("Submission updated: %s", existing_path)
-        return {"id": submission_id, "submitted_at": record["submitted_at"], "updated_at": record["updated_at"], "plant_name": plant_name, "is_update": True}
-    else:
-        submission_id = now.strftime("%Y%m%d_%H%M%S")
-        filename = f"{submission_id}_{plant_name.replace(' ', '_').lower()}.json"
-        record = {
-            "id": submission_id,
-            "submitted_at": now.isoformat(),
-            "updated_at": None,
-            "plant_name": plant_name,
-            "template_name": validated_payload.get("template_name", ""),
-            "data": validated_payload,
-        }
-        filepath = SUBMISSIONS_DIR / filename
-        with open(filepath, "w", encoding="utf-8") as f:
-            json.dump(record, f, indent=2, default=str)
-        logger.info("Submission saved: %s", filepath)
-        return {"id": submission_id, "submitted_at": record["submitted_at"], "updated_at": None, "plant_name": plant_name, "is_update": False}
+def parse_payload(raw: bytes | str) -> OnboardingPayload:
+    """Validate a raw JSON request body straight into an OnboardingPayload.
+
+    Raises:
+        pydantic.ValidationError: If the body is not a valid payload.
+    """
+    return _PAYLOAD_ADAPTER.validate_json(raw)
+
+
+def validate_onboarding(payload: OnboardingPayload) -> dict:
+    """Validate and enrich a typed payload, then serialize it once for storage.
+
+    Same checks as validate_payload, but run on the model objects.
+
+    Returns:
+        JSON-ready dict with the same shape as validate_payload's output.
+
+    Raises:
+        ValueError: If asset names are duplicated.
+    """
+    duplicates = check_duplicate_assets([{"name": a.name} for a in payload.assets])
+    if duplicates:
+        raise ValueError(f"Duplicate asset names found: {', '.join(duplicates)}")
+
+    for formula in payload.formulas:
+        if formula.expression.strip():
+            try:
+                formula.depends_on = extract_identifiers(formula.expression)
+            except SyntaxError:
+                pass
+
+    logger.info("Onboarding payload validated: plant=%s, assets=%d, params=%d, formulas=%d",
+                payload.plant.name, len(payload.assets),
+                len(payload.parameters), len(payload.formulas))
+
+    return payload.model_dump(mode="json")
+
+
+def save_submission(validated_payload: dict, expected_hash: str | None = None) -> dict:
+    """Save or update a submission. Same plant name = same submission (upsert).
+
+    Args:
+        validated_payload: Output of validate_payload.
+        expected_hash: If given, the content hash the caller last saw for
+                       this plant. The save is refused if it no longer matches.
+                       ``"*"`` only requires that a submission already exists.
+
+    Returns:
+        Submission metadata. ``unchanged`` is True when the stored record
+        already had identical content and nothing was written.
+
+    Raises:
+        StaleSubmissionError: If expected_hash does not match the stored record.
+    """
+    with _lock:
+        _ensure_dir()
+        plant_name = validated_payload.get("plant", {}).get("name", "unknown")
+        now = datetime.now(timezone.utc)
+        digest = content_hash(validated_payload)
+
+        existing_dir = _find_by_plant_name(plant_name)
+        old_meta = _read_json(existing_dir / META_FILE) if existing_dir else {}
+        stored_hash = None
+        if existing_dir:
+            # Records saved before hashing have none stored; derive it.
+            stored_hash = old_meta.get("content_hash") or content_hash(_read_record(existing_dir)["data"])
+        if expected_hash == "*":
+            if not existing_dir:
+                raise StaleSubmissionError(f"No submission exists for '{plant_name}'")
+        elif expected_hash is not None and stored_hash != expected_hash:
+            raise StaleSubmissionError(f"Submission for '{plant_name}' has changed since hash {expected_hash}")
+
+        if existing_dir and stored_hash == digest:
+            logger.info("Submission unchanged, skipping write: %s", existing_dir)
+            return {"id": old_meta.get("id"), "submitted_at": old_meta.get("submitted_at"), "updated_at": old_meta.get("updated_at"), "plant_name": old_meta.get("plant_name"), "content_hash": digest, "is_update": False, "unchanged": True}
+
+        _ensure_analytics()
+        _ensure_search_index()
+
+        if existing_dir:
+            old_record = _read_record(existing_dir, _ANALYTICS_FIELDS)
+            submission_id = old_record.get("id")
+            record = {
+                "id": submission_id,
+                "submitted_at": old_record.get("submitted_at"),
+                "updated_at": now.isoformat(),
+                "plant_name": plant_name,
+                "template_name": validated_payload.get("template_name", ""),
+                "content_hash": digest,
+                "data": validated_payload,
+            }
+            _write_record(existing_dir, record)
+            analytics_service.update(old_record["data"], validated_payload)
+            search_service.index_submission(record)
+            logger.info("Submission updated: %s", existing_dir)
+            return {"id": submission_id, "submitted_at": record["submitted_at"], "updated_at": record["updated_at"], "plant_name": plant_name, "content_hash": digest, "is_update": True, "unchanged": False}
+        else:
+            submission_id = now.strftime("%Y%m%d_%H%M%S_%f")
+            dirname = f"{submission_id}_{plant_name.replace(' ', '_').lower()}"
+            record = {
+                "id": submission_id,
+                "submitted_at": now.isoformat(),
+                "updated_at": None,
+                "plant_name": plant_name,
+                "template_name": validated_payload.get("template_name", ""),
+                "content_hash": digest,
+                "data": validated_payload,
+            }
+            record_dir = SUBMISSIONS_DIR / dirname
+            _write_record(record_dir, record)
+            analytics_service.update(None, validated_payload)
+            search_service.index_submission(record)
+            logger.info("Submission saved: %s", record_dir)
+            return {"id": submission_id, "submitted_at": record["submitted_at"], "updated_at": None, "plant_name": plant_name, "content_hash": digest, "is_update": False, "unchanged": False}
 
 
 def list_submissions() -> list[dict]:
     """List all saved submissions (metadata only)."""
     _ensure_dir()
     submissions = []
-    for path in sorted(SUBMISSIONS_DIR.glob("*.json"), reverse=True):
+    for path in sorted(SUBMISSIONS_DIR.glob(f"*/{META_FILE}"), reverse=True):
         try:
-            with open(path, "r", encoding="utf-8") as f:
-                record = json.load(f)
+            record = _read_json(path)
             submissions.append({
                 "id": record.get("id"),
                 "submitted_at": record.get("submitted_at"),
                 "updated_at": record.get("updated_at"),
                 "plant_name": record.get("plant_name"),
                 "template_name": record.get("template_name", ""),
-                "filename": path.name,
+                "content_hash": record.get("content_hash"),
+                "filename": path.parent.name,
             })
         except (json.JSONDecodeError, KeyError):
             continue
     return submissions
 
 
-def get_submission(submission_id: str) -> dict | None:
-    """Load a single submission by ID."""
-    _ensure_dir()
-    for path in SUBMISSIONS_DIR.glob(f"{submission_id}_*.json"):
-        with open(path, "r", encoding="utf-8") as f:
-            return json.load(f)
-    return None
+def get_submission(submission_id: str, fields: tuple[str, ...] = FIELDS) -> dict | None:
+    """Load a single submission by ID.
+
+    Args:
+        submission_id: The submission ID.
+        fields: Data sections to load. Sections not listed are never read.
+
+    Returns:
+        The record with ``data`` holding only the requested sections,
+        or None if not found. A full record saved before content hashing
+        gets its ``content_hash`` computed on read.
+    """
+    record_dir = _find_by_id(submission_id)
+    if record_dir is None:
+        return None
+    record = _read_record(record_dir, fields)
+    if fields == FIELDS and not record.get("content_hash"):
+        record["content_hash"] = content_hash(record["data"])
+    return record
 
 
 def delete_submission(submission_id: str) -> bool:
     """Delete a submission by ID. Returns True if found and deleted."""
-    _ensure_dir()
-    for path in SUBMISSIONS_DIR.glob(f"{submission_id}_*.json"):
-        path.unlink()
-        logger.info("Submission deleted: %s", path)
+    with _lock:
+        record_dir = _find_by_id(submission_id)
+        if record_dir is None:
+            return False
+        _ensure_analytics()
+        _ensure_search_index()
+        old_record = _read_record(record_dir, _ANALYTICS_FIELDS)
+        shutil.rmtree(record_dir)
+        analytics_service.update(old_record["data"], None)
+        search_service.remove_submission(submission_id)
+        readings_service.delete_plant(submission_id)
+        logger.info("Submission deleted: %s", record_dir)
         return True
-    return False
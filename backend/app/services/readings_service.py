@@ -0,0 +1,187 @@
+"""Columnar, memory-mapped storage for parameter time-series readings.
+
+Each plant gets a directory per enabled parameter holding two append-only
+binary columns: int64 epoch-millisecond timestamps and float64 values.
+Range queries memory-map both columns and return slices of the mapping,
+so no data is copied until the caller serializes it.
+"""
+
+import logging
+import os
+import re
+import shutil
+import threading
+from pathlib import Path
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+READINGS_DIR = Path(__file__).resolve().parent.parent / "data" / "readings"
+
+TIMESTAMP_FILE = "timestamps.i8"
+VALUE_FILE = "values.f8"
+TIMESTAMP_DTYPE = np.dtype("<i8")
+VALUE_DTYPE = np.dtype("<f8")
+
+_NAME_RE = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+_lock = threading.Lock()
+
+
+def _series_dir(submission_id: str, parameter: str) -> Path:
+    return READINGS_DIR / submission_id / parameter
+
+
+def _map(path: Path, dtype: np.dtype) -> np.ndarray:
+    """Memory-map a column read-only; empty or missing files map to an empty array."""
+    rows = path.stat().st_size // dtype.itemsize if path.exists() else 0
+    if rows == 0:
+        return np.empty(0, dtype=dtype)
+    # An explicit shape ignores a partial trailing row left by a torn write.
+    return np.memmap(path, dtype=dtype, mode="r", shape=(rows,))
+
+
+def _last_timestamp(path: Path) -> int | None:
+    if not path.exists() or path.stat().st_size < TIMESTAMP_DTYPE.itemsize:
+        return None
+    with open(path, "rb") as f:
+        f.seek(-TIMESTAMP_DTYPE.itemsize, 2)
+        return int(np.frombuffer(f.read(), dtype=TIMESTAMP_DTYPE)[0])
+
+
+def _truncate_to_common_length(ts_path: Path, val_path: Path) -> None:
+    """Cut both columns back to the rows they both hold in full.
+
+    A batch interrupted between or during the two writes leaves the columns
+    uneven; appending after that would pair timestamps with the wrong values.
+    """
+    rows = min(
+        ts_path.stat().st_size // TIMESTAMP_DTYPE.itemsize if ts_path.exists() else 0,
+        val_path.stat().st_size // VALUE_DTYPE.itemsize if val_path.exists() else 0,
+    )
+    for path, dtype in ((ts_path, TIMESTAMP_DTYPE), (val_path, VALUE_DTYPE)):
+        if path.exists() and path.stat().st_size != rows * dtype.itemsize:
+            os.truncate(path, rows * dtype.itemsize)
+            logger.warning("Truncated uneven readings column %s to %d rows", path, rows)
+
+
+def append_readings(submission_id: str, parameter: str, timestamps, values) -> dict:
+    """Append a batch of readings to a parameter's columns.
+
+    Args:
+        submission_id: ID of the onboarded plant.
+        parameter: Enabled parameter name.
+        timestamps: Epoch-millisecond timestamps, non-decreasing and not
+                    earlier than the last stored reading.
+        values: Finite reading values, same length as timestamps.
+
+    Returns:
+        Dict with the number of points appended and the new series length.
+
+    Raises:
+        ValueError: If the batch is malformed or out of order.
+    """
+    if not _NAME_RE.match(parameter):
+        raise ValueError(f"Invalid parameter name: '{parameter}'")
+
+    ts = np.ascontiguousarray(timestamps, dtype=TIMESTAMP_DTYPE)
+    vals = np.ascontiguousarray(values, dtype=VALUE_DTYPE)
+    if ts.ndim != 1 or ts.shape != vals.shape:
+        raise ValueError("timestamps and values must be flat arrays of the same length")
+    if ts.size > 1 and np.any(ts[1:] < ts[:-1]):
+        raise ValueError("timestamps must be non-decreasing")
+    if not np.isfinite(vals).all():
+        raise ValueError("values must be finite numbers")
+
+    series_dir = _series_dir(submission_id, parameter)
+    with _lock:
+        series_dir.mkdir(parents=True, exist_ok=True)
+        ts_path = series_dir / TIMESTAMP_FILE
+        val_path = series_dir / VALUE_FILE
+        _truncate_to_common_length(ts_path, val_path)
+        last = _last_timestamp(ts_path)
+        if ts.size and last is not None and ts[0] < last:
+            raise ValueError(f"timestamps must not be earlier than the last stored reading ({last})")
+        with open(ts_path, "ab") as f:
+            f.write(ts.data)
+        with open(val_path, "ab") as f:
+            f.write(vals.data)
+        total = ts_path.stat().st_size // TIMESTAMP_DTYPE.itemsize
+
+    return {"appended": int(ts.size), "total": int(total)}
+
+
+def read_range(
+    submission_id: str,
+    parameter: str,
+    start: int | None = None,
+    end: int | None = None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Return the readings with ``start <= timestamp < end``.
+
+    Args:
+        submission_id: ID of the onboarded plant.
+        parameter: Enabled parameter name.
+        start: Inclusive lower bound in epoch milliseconds, or None.
+        end: Exclusive upper bound in epoch milliseconds, or None.
+
+    Returns:
+        (timestamps, values) as read-only views over the memory-mapped
+        columns. Both are empty if the series does not exist.
+    """
+    if not _NAME_RE.match(parameter):
+        raise ValueError(f"Invalid parameter name: '{parameter}'")
+
+    series_dir = _series_dir(submission_id, parameter)
+    ts = _map(series_dir / TIMESTAMP_FILE, TIMESTAMP_DTYPE)
+    vals = _map(series_dir / VALUE_FILE, VALUE_DTYPE)
+    # A batch interrupted between the two writes leaves the columns uneven.
+    n = min(ts.size, vals.size)
+
+    lo = 0 if start is None else int(np.searchsorted(ts[:n], start, side="left"))
+    hi = n if end is None else int(np.searchsorted(ts[:n], end, side="left"))
+    return ts[lo:hi], vals[lo:hi]
+
+
+def page(timestamps: np.ndarray, values: np.ndarray, limit: int) -> tuple[np.ndarray, np.ndarray, int | None]:
+    """Cut a range result down to about ``limit`` readings.
+
+    A page never ends partway through readings that share a timestamp, so
+    the next page can start at ``next_start`` without repeats or gaps. If
+    more than ``limit`` readings share the first timestamp, the page holds
+    all of them.
+
+    Args:
+        timestamps: Timestamps from read_range.
+        values: Values from read_range.
+        limit: Preferred maximum number of readings.
+
+    Returns:
+        (timestamps, values, next_start), where next_start is the timestamp
+        to pass as ``start`` for the next page, or None if nothing remains.
+    """
+    if timestamps.size <= limit:
+        return timestamps, values, None
+    boundary = timestamps[limit]
+    cut = int(np.searchsorted(timestamps[:limit], boundary, side="left"))
+    if cut == 0:
+        cut = int(np.searchsorted(timestamps, boundary, side="right"))
+    next_start = int(timestamps[cut]) if cut < timestamps.size else None
+    return timestamps[:cut], values[:cut], next_start
+
+
+def list_series(submission_id: str) -> list[str]:
+    """Return the parameter names that have stored readings for a plant."""
+    plant_dir = READINGS_DIR / submission_id
+    if not plant_dir.is_dir():
+        return []
+    return sorted(p.name for p in plant_dir.iterdir() if (p / TIMESTAMP_FILE).exists())
+
+
+def delete_plant(submission_id: str) -> None:
+    """Remove every stored series for a plant."""
+    plant_dir = READINGS_DIR / submission_id
+    if plant_dir.is_dir():
+        shutil.rmtree(plant_dir)
+        logger.info("Readings deleted: %s", plant_dir)
@@ -0,0 +1,188 @@
+"""Full-text search over submissions backed by SQLite FTS5.
+
+The index stores each plant's name, address, manager email and asset names
+in a trigram FTS table, so any substring of three or more characters
+matches. Results are ranked with bm25, weighting the plant name highest.
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+from collections.abc import Iterable
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+SEARCH_DB_PATH = Path(__file__).resolve().parent.parent / "data" / "search.db"
+
+MIN_TERM_LENGTH = 3
+
+# bm25 column weights: plant_name, address, manager_email, assets
+_WEIGHTS = (10.0, 2.0, 2.0, 1.0)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS docs (
+    rowid INTEGER PRIMARY KEY,
+    id TEXT UNIQUE NOT NULL,
+    plant_name TEXT,
+    template_name TEXT,
+    submitted_at TEXT,
+    updated_at TEXT
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS docs_fts USING fts5(
+    plant_name, address, manager_email, assets,
+    tokenize = 'trigram'
+);
+"""
+
+_lock = threading.Lock()
+
+
+def _connect(path: Path | None = None) -> sqlite3.Connection:
+    path = path or SEARCH_DB_PATH
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(path)
+    conn.executescript(_SCHEMA)
+    return conn
+
+
+def _remove(conn: sqlite3.Connection, submission_id: str) -> None:
+    row = conn.execute("SELECT rowid FROM docs WHERE id = ?", (submission_id,)).fetchone()
+    if row:
+        conn.execute("DELETE FROM docs_fts WHERE rowid = ?", row)
+        conn.execute("DELETE FROM docs WHERE rowid = ?", row)
+
+
+def _insert(conn: sqlite3.Connection, record: dict) -> None:
+    data = record.get("data", {})
+    plant = data.get("plant", {})
+    assets = " ".join(
+        f"{a.get('name', '')} {a.get('display_name', '')}" for a in data.get("assets", [])
+    )
+    cursor = conn.execute(
+        "INSERT INTO docs (id, plant_name, template_name, submitted_at, updated_at) VALUES (?, ?, ?, ?, ?)",
+        (record["id"], record.get("plant_name"), record.get("template_name", ""),
+         record.get("submitted_at"), record.get("updated_at")),
+    )
+    conn.execute(
+        "INSERT INTO docs_fts (rowid, plant_name, address, manager_email, assets) VALUES (?, ?, ?, ?, ?)",
+        (cursor.lastrowid, plant.get("name", ""), plant.get("address", ""),
+         plant.get("manager_email", ""), assets),
+    )
+
+
+def is_built() -> bool:
+    """Return True if the search index exists on disk."""
+    return SEARCH_DB_PATH.exists()
+
+
+def index_submission(record: dict) -> None:
+    """Add or replace a submission in the index.
+
+    Args:
+        record: Submission record with at least the plant and assets sections.
+    """
+    with _lock:
+        conn = _connect()
+        try:
+            with conn:
+                _remove(conn, record["id"])
+                _insert(conn, record)
+        finally:
+            conn.close()
+
+
+def remove_submission(submission_id: str) -> None:
+    """Remove a submission from the index."""
+    with _lock:
+        conn = _connect()
+        try:
+            with conn:
+                _remove(conn, submission_id)
+        finally:
+            conn.close()
+
+
+def rebuild(records: Iterable[dict]) -> int:
+    """Recreate the index from scratch.
+
+    The new index is built in a temporary file and swapped in only once it
+    is complete, so a failed rebuild leaves the previous index in place.
+
+    Args:
+        records: Submission records with the plant and assets sections.
+
+    Returns:
+        Number of submissions indexed.
+    """
+    with _lock:
+        tmp_path = SEARCH_DB_PATH.with_name(SEARCH_DB_PATH.name + ".tmp")
+        tmp_path.unlink(missing_ok=True)
+        count = 0
+        try:
+            conn = _connect(tmp_path)
+            try:
+                with conn:
+                    for record in records:
+                        _insert(conn, record)
+                        count += 1
+            finally:
+                conn.close()
+            os.replace(tmp_path, SEARCH_DB_PATH)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+    logger.info("Search index rebuilt: %d submissions", count)
+    return count
+
+
+def _match_query(q: str) -> str:
+    """Turn free text into an FTS5 query that ANDs each term as a substring."""
+    terms = [t for t in q.split() if len(t) >= MIN_TERM_LENGTH]
+    if not terms:
+        raise ValueError(f"Search needs at least one term of {MIN_TERM_LENGTH} or more characters")
+    return " ".join('"' + t.replace('"', '""') + '"' for t in terms)
+
+
+def search(q: str, limit: int = 20) -> list[dict]:
+    """Find submissions matching every term in ``q``.
+
+    Args:
+        q: Free text. Each whitespace-separated term of three or more
+           characters must appear in the name, address, email or asset names.
+        limit: Maximum number of results.
+
+    Returns:
+        Submission metadata dicts with a ``score`` key, best match first.
+
+    Raises:
+        ValueError: If q has no usable search term.
+    """
+    query = _match_query(q)
+    conn = _connect()
+    try:
+        rows = conn.execute(
+            f"""
+            SELECT d.id, d.plant_name, d.template_name, d.submitted_at, d.updated_at,
+                   bm25(docs_fts, {", ".join(map(str, _WEIGHTS))}) AS rank
+            FROM docs_fts JOIN docs d ON d.rowid = docs_fts.rowid
+            WHERE docs_fts MATCH ?
+            ORDER BY rank
+            LIMIT ?
+            """,
+            (query, limit),
+        ).fetchall()
+    finally:
+        conn.close()
+    return [
+        {
+            "id": row[0],
+            "plant_name": row[1],
+            "template_name": row[2],
+            "submitted_at": row[3],
+            "updated_at": row[4],
+            "score": -row[5],
+        }
+        for row in rows
+    ]
@@ -0,0 +1,149 @@
+"""Vectorized unit conversion driven by the registry's unit_options.
+
+Every known unit maps onto a base unit of its dimension as
+``base = value * scale + offset``. For each registry parameter the pairwise
+conversions between its ``unit_options`` are precomputed as affine
+``(a, b)`` coefficients, so converting a whole array is one multiply-add.
+The coefficients are derived in exact rational arithmetic and rounded once,
+so e.g. °C to °F is exactly ``(1.8, 32.0)``.
+"""
+
+from fractions import Fraction
+
+import numpy as np
+
+from app.services.parameter_service import get_all_parameters
+
+# unit -> (dimension, scale, offset) relative to the dimension's base unit.
+# Temperature uses Fractions so offsets like 273.15 and 5/9 stay exact.
+UNITS: dict[str, tuple[str, float | Fraction, float | Fraction]] = {
+    # mass (kg); "ton" is the US short ton, "MT" the metric tonne
+    "kg": ("mass", 1.0, 0.0),
+    "g": ("mass", 1e-3, 0.0),
+    "MT": ("mass", 1000.0, 0.0),
+    "ton": ("mass", 907.18474, 0.0),
+    # temperature (K)
+    "K": ("temperature", Fraction(1), Fraction(0)),
+    "°C": ("temperature", Fraction(1), Fraction("273.15")),
+    "°F": ("temperature", Fraction(5, 9), Fraction("273.15") - 32 * Fraction(5, 9)),
+    # pressure (kPa)
+    "kPa": ("pressure", 1.0, 0.0),
+    "MPa": ("pressure", 1000.0, 0.0),
+    "bar": ("pressure", 100.0, 0.0),
+    "psi": ("pressure", 6.894757293168361, 0.0),
+    # energy (kWh)
+    "kWh": ("energy", 1.0, 0.0),
+    "MWh": ("energy", 1e3, 0.0),
+    "GWh": ("energy", 1e6, 0.0),
+    # volume (L)
+    "L": ("volume", 1.0, 0.0),
+    "KL": ("volume", 1000.0, 0.0),
+    "m³": ("volume", 1000.0, 0.0),
+    # mass flow (kg/hr)
+    "kg/hr": ("mass_flow", 1.0, 0.0),
+    "T/hr": ("mass_flow", 1000.0, 0.0),
+    "lb/hr": ("mass_flow", 0.45359237, 0.0),
+    # calorific value (kJ/kg)
+    "kcal/kg": ("calorific_value", 4.1868, 0.0),
+    "MJ/kg": ("calorific_value", 1000.0, 0.0),
+    "BTU/lb": ("calorific_value", 2.326, 0.0),
+    # heat rate (kJ/kWh)
+    "kJ/kWh": ("heat_rate", 1.0, 0.0),
+    "kcal/kWh": ("heat_rate", 4.1868, 0.0),
+    "BTU/kWh": ("heat_rate", 1.05505585262, 0.0),
+    # specific consumption per energy (kg/kWh)
+    "kg/kWh": ("specific_consumption", 1.0, 0.0),
+    "g/kWh": ("specific_consumption", 1e-3, 0.0),
+    "MT/MWh": ("specific_consumption", 1.0, 0.0),
+    # specific consumption per product mass (kg/MT)
+    "kg/MT": ("mass_ratio", 1.0, 0.0),
+    # ratio (fraction)
+    "decimal": ("ratio", 1.0, 0.0),
+    "%": ("ratio", 0.01, 0.0),
+    # emissions (kg CO2e)
+    "kg CO2": ("emissions", 1.0, 0.0),
+    "tCO2e": ("emissions", 1000.0, 0.0),
+    "MT CO2": ("emissions", 1000.0, 0.0),
+}
+
+_tables_cache: dict[str, dict] | None = None
+
+
+def _affine(from_unit: str, to_unit: str) -> tuple[float, float]:
+    """Return (a, b) such that ``to = from * a + b``."""
+    _, s1, o1 = UNITS[from_unit]
+    _, s2, o2 = UNITS[to_unit]
+    s1, o1, s2, o2 = map(Fraction, (s1, o1, s2, o2))
+    return float(s1 / s2), float((o1 - o2) / s2)
+
+
+def build_table(default_unit: str, unit_options: list[str]) -> dict:
+    """Precompute pairwise conversions between a parameter's unit options.
+
+    Args:
+        default_unit: The parameter's registry unit.
+        unit_options: All units the parameter may be recorded in.
+
+    Returns:
+        Dict with the default unit and a ``factors`` mapping of
+        (from_unit, to_unit) to (a, b). Units that are unknown or of a
+        different dimension than their counterpart are left out.
+    """
+    units = [u for u in dict.fromkeys([default_unit, *unit_options]) if u in UNITS]
+    factors = {
+        (src, dst): _affine(src, dst)
+        for src in units
+        for dst in units
+        if src != dst and UNITS[src][0] == UNITS[dst][0]
+    }
+    return {"unit": default_unit, "factors": factors}
+
+
+def _load_tables() -> dict[str, dict]:
+    """Build conversion tables for every registry parameter, caching on first call."""
+    global _tables_cache
+    if _tables_cache is None:
+        _tables_cache = {
+            p["name"]: build_table(p["unit"], p.get("unit_options", []))
+            for p in get_all_parameters()
+        }
+    return _tables_cache
+
+
+def get_conversion_table(parameter: str) -> dict | None:
+    """Return a parameter's conversion table, or None if it is not in the registry."""
+    return _load_tables().get(parameter)
+
+
+def convert(parameter: str, values, from_unit: str, to_unit: str | None = None) -> np.ndarray:
+    """Convert an array of values between two of a parameter's units.
+
+    Args:
+        parameter: Registry parameter name.
+        values: Array-like of numbers.
+        from_unit: Unit the values are recorded in.
+        to_unit: Target unit. Defaults to the parameter's registry unit.
+
+    Returns:
+        Float64 array of converted values. The input array is returned
+        unchanged (not copied) when no conversion is needed.
+
+    Raises:
+        ValueError: If the parameter is unknown or the units are not
+                    convertible for it.
+    """
+    table = get_conversion_table(parameter)
+    if table is None:
+        raise ValueError(f"Unknown parameter: '{parameter}'")
+    to_unit = to_unit or table["unit"]
+    arr = np.asarray(values, dtype=np.float64)
+    if from_unit == to_unit:
+        return arr
+    try:
+        a, b = table["factors"][(from_unit, to_unit)]
+    except KeyError:
+        raise ValueError(f"Cannot convert '{parameter}' from '{from_unit}' to '{to_unit}'") from None
+    out = arr * a
+    if b:
+        out += b
+    return out
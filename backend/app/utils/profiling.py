@@ -0,0 +1,196 @@
+"""Opt-in per-request sampling profiler.
+
+When a request is selected for profiling, a background thread samples the
+Python stacks of all threads every few milliseconds until the response is
+sent, and the samples are written as a speedscope JSON file named after the
+request id (open it at https://www.speedscope.app). Sampling covers the
+threadpool workers that run sync endpoints, which an in-thread profiler
+like cProfile would miss. Samples of threads parked in an idle wait (the
+event loop's select, or uvloop's native loop under asyncio's runner, and
+workers waiting for jobs) are dropped, and the busiest thread's profile is
+the one speedscope opens. Under concurrency, other in-flight requests can
+appear in the same profile.
+
+The middleware is only installed when profiling is configured, so requests
+pay nothing when it is off.
+"""
+
+import hmac
+import json
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from pathlib import Path
+
+from starlette.concurrency import run_in_threadpool
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = "x-profile"
+REQUEST_ID_HEADER = "x-request-id"
+
+# A thread whose innermost frame is in one of these modules is waiting, not
+# working. uvloop runs its loop in C, so an idle uvloop thread's innermost
+# Python frame is asyncio's Runner.run.
+_IDLE_MODULES = tuple(
+    f"{os.sep}{name}"
+    for name in ("threading.py", "selectors.py", "queue.py", os.path.join("asyncio", "runners.py"))
+)
+_REQUEST_ID_RE = re.compile(r"^[A-Za-z0-9_.-]{1,64}$")
+
+
+class StackSampler:
+    """Collects stack samples of every other thread at a fixed interval."""
+
+    def __init__(self, interval: float = 0.001):
+        self.interval = interval
+        self.samples: dict[int, list[list]] = {}
+        self.weights: dict[int, list[float]] = {}
+        self._idle_code: dict[object, bool] = {}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self.started_at = 0.0
+        self.duration = 0.0
+
+    def start(self) -> None:
+        self.started_at = time.perf_counter()
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+        self.duration = time.perf_counter() - self.started_at
+
+    def _is_idle(self, code) -> bool:
+        known = self._idle_code.get(code)
+        if known is None:
+            known = code.co_filename.endswith(_IDLE_MODULES)
+            self._idle_code[code] = known
+        return known
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        last = time.perf_counter()
+        while not self._stop.wait(self.interval):
+            now = time.perf_counter()
+            elapsed, last = now - last, now
+            for tid, frame in sys._current_frames().items():
+                if tid == own or self._is_idle(frame.f_code):
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(frame.f_code)
+                    frame = frame.f_back
+                stack.reverse()
+                self.samples.setdefault(tid, []).append(stack)
+                self.weights.setdefault(tid, []).append(elapsed)
+
+    def to_speedscope(self, name: str) -> dict:
+        """Convert collected samples into a speedscope file document."""
+        frames: list[dict] = []
+        frame_index: dict[tuple, int] = {}
+        profiles = []
+        thread_names = {t.ident: t.name for t in threading.enumerate()}
+        for tid, samples in self.samples.items():
+            indexed = []
+            for stack in samples:
+                row = []
+                for code in stack:
+                    key = (code.co_filename, code.co_qualname, code.co_firstlineno)
+                    idx = frame_index.get(key)
+                    if idx is None:
+                        idx = frame_index[key] = len(frames)
+                        frames.append({"name": code.co_qualname, "file": code.co_filename, "line": code.co_firstlineno})
+                    row.append(idx)
+                indexed.append(row)
+            weights = self.weights[tid]
+            profiles.append({
+                "type": "sampled",
+                "name": thread_names.get(tid, f"thread {tid}"),
+                "unit": "seconds",
+                "startValue": 0,
+                "endValue": sum(weights),
+                "samples": indexed,
+                "weights": weights,
+            })
+        busiest = max(range(len(profiles)), key=lambda i: profiles[i]["endValue"], default=0)
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": name,
+            "exporter": "latspace-onboarding",
+            "activeProfileIndex": busiest,
+            "shared": {"frames": frames},
+            "profiles": profiles,
+        }
+
+
+class ProfilingMiddleware:
+    """ASGI middleware that profiles selected requests.
+
+    A request is profiled when it carries an ``X-Profile`` header equal to
+    the configured admin token, or when it is picked at the configured
+    sampling rate. Profiled responses get ``X-Request-ID`` and
+    ``X-Profile-Id`` headers naming the written artifact.
+    """
+
+    def __init__(
+        self,
+        app,
+        output_dir: Path,
+        token: str | None = None,
+        sample_rate: float = 0.0,
+        interval: float = 0.001,
+    ):
+        self.app = app
+        self.output_dir = Path(output_dir)
+        self.token = token.encode("latin-1") if token else None
+        self.sample_rate = sample_rate
+        self.interval = interval
+
+    def _should_profile(self, headers: dict[bytes, bytes]) -> bool:
+        supplied = headers.get(PROFILE_HEADER.encode())
+        if self.token and supplied and hmac.compare_digest(supplied, self.token):
+            return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        headers = dict(scope["headers"])
+        if not self._should_profile(headers):
+            await self.app(scope, receive, send)
+            return
+
+        supplied_id = headers.get(REQUEST_ID_HEADER.encode(), b"").decode("latin-1")
+        request_id = supplied_id if _REQUEST_ID_RE.match(supplied_id) else uuid.uuid4().hex
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                message.setdefault("headers", [])
+                message["headers"] = [
+                    *message["headers"],
+                    (REQUEST_ID_HEADER.encode(), request_id.encode()),
+                    (b"x-profile-id", request_id.encode()),
+                ]
+            await send(message)
+
+        sampler = StackSampler(self.interval)
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_with_headers)
+        finally:
+            sampler.stop()
+            name = f"{scope['method']} {scope['path']} ({request_id})"
+            await run_in_threadpool(self._write, request_id, sampler, name)
+            logger.info("Profiled %s in %.1f ms", name, sampler.duration * 1e3)
+
+    def _write(self, request_id: str, sampler: StackSampler, name: str) -> None:
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        with open(self.output_dir / f"{request_id}.speedscope.json", "w", encoding="utf-8") as f:
+            json.dump(sampler.to_speedscope(name), f)
@@ -0,0 +1,97 @@
+"""Benchmark onboarding payload ingest: dict round-trips vs raw-bytes validation.
+
+"before" replays the previous request path: decode JSON, build the model,
+model_dump() it back to dicts, run validate_payload, then encode the response
+the way FastAPI does for a returned dict (jsonable_encoder + json.dumps).
+"after" validates the raw body with parse_payload, enriches the typed model
+with validate_onboarding and dumps the already JSON-ready result once, as the
+JSONResponse returned by the endpoint does. Storage is not included.
+
+Run from the backend directory: python -m benchmarks.bench_onboarding_ingest
+"""
+
+import argparse
+import json
+import logging
+import time
+
+from fastapi.encoders import jsonable_encoder
+
+from app.models.schemas import OnboardingPayload
+from app.services import onboarding_service
+
+logging.getLogger("app.services.onboarding_service").setLevel(logging.WARNING)
+
+
+def make_body(assets: int, parameters: int, formulas: int) -> bytes:
+    payload = {
+        "plant": {"name": "Bench Plant", "address": "1 Bench Rd", "manager_email": "bench@example.com"},
+        "template_name": "",
+        "assets": [
+            {"name": f"asset_{i}", "display_name": f"Asset {i}", "type": "boiler"}
+            for i in range(assets)
+        ],
+        "parameters": [
+            {
+                "name": f"param_{i}",
+                "display_name": f"Param {i}",
+                "unit": "MT",
+                "category": "input",
+                "section": "COGEN BOILER",
+                "applicable_asset_types": ["boiler", "turbine"],
+                "enabled": True,
+            }
+            for i in range(parameters)
+        ],
+        "formulas": [
+            {"parameter_name": f"calc_{i}", "expression": f"param_{i} * 0.95 + param_{(i + 1) % parameters}"}
+            for i in range(formulas)
+        ],
+    }
+    return json.dumps(payload).encode("utf-8")
+
+
+def before(body: bytes) -> bytes:
+    payload = OnboardingPayload.model_validate(json.loads(body))
+    result = onboarding_service.validate_payload(payload.model_dump())
+    return json.dumps(jsonable_encoder(result)).encode("utf-8")
+
+
+def after(body: bytes) -> bytes:
+    result = onboarding_service.validate_onboarding(onboarding_service.parse_payload(body))
+    return json.dumps(result).encode("utf-8")
+
+
+def bench(fn, body: bytes, seconds: float) -> tuple[int, float]:
+    fn(body)
+    runs = 0
+    start = time.perf_counter()
+    while (elapsed := time.perf_counter() - start) < seconds:
+        fn(body)
+        runs += 1
+    return runs, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--assets", type=int, default=200)
+    parser.add_argument("--parameters", type=int, default=2000)
+    parser.add_argument("--formulas", type=int, default=500)
+    parser.add_argument("--seconds", type=float, default=3.0)
+    args = parser.parse_args()
+
+    body = make_body(args.assets, args.parameters, args.formulas)
+    print(f"payload: {len(body) / 1024:.0f} KiB, {args.assets} assets, "
+          f"{args.parameters} parameters, {args.formulas} formulas")
+
+    results = {}
+    for name, fn in (("before", before), ("after", after)):
+        runs, elapsed = bench(fn, body, args.seconds)
+        results[name] = runs / elapsed
+        print(f"{name:>6}: {runs / elapsed:8.1f} payloads/s  "
+              f"{len(body) * runs / elapsed / 2**20:8.1f} MiB/s  {elapsed / runs * 1e3:7.2f} ms/payload")
+    print(f"speedup: {results['after'] / results['before']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
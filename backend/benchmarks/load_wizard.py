@@ -0,0 +1,298 @@
+"""Replay concurrent wizard sessions against a local app and report latencies.
+
+Each virtual user walks through the wizard the way the frontend does:
+fetch parameters for every asset type it configures, fire a burst of
+formula validations, submit the onboarding payload, then list submissions
+and open its own. Users start evenly over the ramp period. The report gives
+p50/p95/p99 latency and throughput per endpoint, as text and optionally JSON.
+
+By default a fresh app is started with uvicorn in a subprocess, on a free
+local port, with every data directory in a temporary folder. Pass --url to
+target an already running server instead. Only the standard library and the
+app's own dependencies are used, so it runs fully offline.
+
+Run from the backend directory:
+    python -m benchmarks.load_wizard --users 500 --ramp 30 --json report.json
+"""
+
+import argparse
+import http.client
+import json
+import math
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.parse
+from pathlib import Path
+
+ASSET_TYPES = ("boiler", "turbine", "product", "kiln", "other")
+
+
+class Recorder:
+    """Thread-safe store of per-endpoint latencies and errors."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies: dict[str, list[float]] = {}
+        self.errors: dict[str, int] = {}
+
+    def record(self, label: str, seconds: float, ok: bool) -> None:
+        with self._lock:
+            self.latencies.setdefault(label, []).append(seconds)
+            if not ok:
+                self.errors[label] = self.errors.get(label, 0) + 1
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+class WizardSession:
+    """One virtual user with its own keep-alive connection."""
+
+    def __init__(self, base_url: str, recorder: Recorder, user: int, formulas: int, rng: random.Random):
+        parsed = urllib.parse.urlsplit(base_url)
+        self.host, self.port = parsed.hostname, parsed.port or 80
+        self.recorder = recorder
+        self.user = user
+        self.formulas = formulas
+        self.rng = rng
+        self.conn: http.client.HTTPConnection | None = None
+
+    def _request(self, label: str, method: str, path: str, body: dict | None = None):
+        data = json.dumps(body).encode("utf-8") if body is not None else None
+        headers = {"Content-Type": "application/json"} if data is not None else {}
+        for attempt in (1, 2):
+            if self.conn is None:
+                self.conn = http.client.HTTPConnection(self.host, self.port, timeout=120)
+            start = time.perf_counter()
+            try:
+                self.conn.request(method, path, body=data, headers=headers)
+                response = self.conn.getresponse()
+                payload = response.read()
+            except (ConnectionError, http.client.HTTPException, socket.timeout):
+                self.conn.close()
+                self.conn = None
+                if attempt == 2:
+                    self.recorder.record(label, time.perf_counter() - start, False)
+                    return None
+                continue
+            elapsed = time.perf_counter() - start
+            ok = 200 <= response.status < 300
+            self.recorder.record(label, elapsed, ok)
+            return json.loads(payload) if ok and payload else None
+        return None
+
+    def run(self, iteration: int) -> None:
+        rng = self.rng
+        asset_types = rng.sample(ASSET_TYPES, rng.randint(1, 3))
+
+        parameters: dict[str, dict] = {}
+        for asset_type in asset_types:
+            result = self._request("GET /api/parameters", "GET", f"/api/parameters?asset_type={asset_type}")
+            for p in result or []:
+                parameters[p["name"]] = p
+        enabled = rng.sample(sorted(parameters), min(len(parameters), rng.randint(3, 12)))
+
+        formulas = []
+        for i in range(self.formulas):
+            names = rng.sample(enabled, min(len(enabled), rng.randint(1, 3))) or ["x"]
+            expression = " + ".join(f"{n} * {rng.randint(1, 9)}" for n in names)
+            if rng.random() < 0.1:
+                expression += " + unknown_param"
+            self._request("POST /api/formulas/validate", "POST", "/api/formulas/validate",
+                          {"expression": expression, "enabled_parameters": enabled})
+            formulas.append({"parameter_name": f"calc_{i}", "expression": expression})
+
+        payload = {
+            "plant": {
+                "name": f"Load Plant {self.user}-{iteration}",
+                "address": f"{self.user} Load Test Road",
+                "manager_email": f"user{self.user}@example.com",
+            },
+            "template_name": "",
+            "assets": [
+                {"name": f"{t}_{n}", "display_name": f"{t.title()} {n}", "type": t}
+                for t in asset_types for n in range(rng.randint(1, 3))
+            ],
+            "parameters": [
+                {k: parameters[name][k] for k in
+                 ("name", "display_name", "unit", "category", "section", "applicable_asset_types")}
+                for name in enabled
+            ],
+            "formulas": formulas[: rng.randint(0, len(formulas))],
+        }
+        result = self._request("POST /api/onboarding", "POST", "/api/onboarding", payload)
+        self._request("GET /api/submissions", "GET", "/api/submissions")
+        if result:
+            submission_id = result["submission"]["id"]
+            self._request("GET /api/submissions/{id}", "GET", f"/api/submissions/{submission_id}")
+
+    def close(self) -> None:
+        if self.conn is not None:
+            self.conn.close()
+
+
+def run_load(base_url: str, users: int, ramp: float, iterations: int, formulas: int, seed: int) -> tuple[Recorder, float]:
+    """Run all virtual users and return the recorder and wall-clock duration."""
+    recorder = Recorder()
+
+    def user_main(user: int, delay: float):
+        time.sleep(delay)
+        session = WizardSession(base_url, recorder, user, formulas, random.Random(seed + user))
+        try:
+            for iteration in range(iterations):
+                session.run(iteration)
+        finally:
+            session.close()
+
+    threads = [
+        threading.Thread(target=user_main, args=(u, ramp * u / users), daemon=True)
+        for u in range(users)
+    ]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return recorder, time.perf_counter() - start
+
+
+def build_report(recorder: Recorder, duration: float, config: dict) -> dict:
+    endpoints = {}
+    total = 0
+    for label, values in sorted(recorder.latencies.items()):
+        ordered = sorted(values)
+        total += len(ordered)
+        endpoints[label] = {
+            "requests": len(ordered),
+            "errors": recorder.errors.get(label, 0),
+            "throughput_rps": len(ordered) / duration,
+            "mean_ms": sum(ordered) / len(ordered) * 1e3,
+            "p50_ms": percentile(ordered, 50) * 1e3,
+            "p95_ms": percentile(ordered, 95) * 1e3,
+            "p99_ms": percentile(ordered, 99) * 1e3,
+            "max_ms": ordered[-1] * 1e3,
+        }
+    return {
+        "config": config,
+        "duration_s": duration,
+        "total_requests": total,
+        "total_errors": sum(recorder.errors.values()),
+        "throughput_rps": total / duration,
+        "endpoints": endpoints,
+    }
+
+
+def format_report(report: dict) -> str:
+    header = f"{'endpoint':<30}{'reqs':>8}{'errs':>6}{'rps':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}"
+    lines = [
+        f"{report['config']['users']} users, ramp {report['config']['ramp']}s, "
+        f"{report['config']['iterations']} session(s) each, {report['duration_s']:.1f}s wall",
+        header,
+        "-" * len(header),
+    ]
+    for label, s in report["endpoints"].items():
+        lines.append(f"{label:<30}{s['requests']:>8}{s['errors']:>6}{s['throughput_rps']:>9.1f}"
+                     f"{s['p50_ms']:>10.1f}{s['p95_ms']:>10.1f}{s['p99_ms']:>10.1f}{s['max_ms']:>10.1f}")
+    lines.append("-" * len(header))
+    lines.append(f"{'total':<30}{report['total_requests']:>8}{report['total_errors']:>6}{report['throughput_rps']:>9.1f}")
+    return "\n".join(lines)
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_ready(base_url: str, process: subprocess.Popen, timeout: float = 30.0) -> None:
+    parsed = urllib.parse.urlsplit(base_url)
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("App process exited during startup")
+        try:
+            conn = http.client.HTTPConnection(parsed.hostname, parsed.port, timeout=1)
+            conn.request("GET", "/api/health")
+            if conn.getresponse().status == 200:
+                return
+        except OSError:
+            pass
+        time.sleep(0.1)
+    raise RuntimeError(f"App did not become ready within {timeout:.0f}s")
+
+
+def serve(port: int, data_dir: Path) -> None:
+    """Run the app with all storage redirected into data_dir."""
+    import uvicorn
+
+    from app.main import app
+    from app.services import analytics_service, onboarding_service, readings_service, search_service
+
+    onboarding_service.SUBMISSIONS_DIR = data_dir / "submissions"
+    analytics_service.ANALYTICS_PATH = data_dir / "analytics.json"
+    readings_service.READINGS_DIR = data_dir / "readings"
+    search_service.SEARCH_DB_PATH = data_dir / "search.db"
+    uvicorn.run(app, host="127.0.0.1", port=port, log_level="warning", backlog=4096)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=50, help="Concurrent virtual users")
+    parser.add_argument("--ramp", type=float, default=5.0, help="Seconds over which users start")
+    parser.add_argument("--iterations", type=int, default=1, help="Wizard sessions per user")
+    parser.add_argument("--formulas", type=int, default=10, help="Formula validations per session")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--url", help="Target a running server instead of starting one")
+    parser.add_argument("--json", type=Path, help="Also write the report as JSON to this path")
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--data-dir", type=Path, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.port, args.data_dir)
+        return
+
+    process = None
+    with tempfile.TemporaryDirectory(prefix="wizard-load-") as tmp:
+        base_url = args.url
+        if not base_url:
+            port = _free_port()
+            base_url = f"http://127.0.0.1:{port}"
+            log = open(Path(tmp) / "app.log", "wb")
+            process = subprocess.Popen(
+                [sys.executable, "-m", "benchmarks.load_wizard", "--serve",
+                 "--port", str(port), "--data-dir", tmp],
+                stdout=log, stderr=subprocess.STDOUT,
+            )
+        try:
+            if process:
+                _wait_ready(base_url, process)
+            recorder, duration = run_load(base_url, args.users, args.ramp, args.iterations, args.formulas, args.seed)
+        finally:
+            if process:
+                process.terminate()
+                process.wait(timeout=10)
+                log.close()
+
+    config = {"users": args.users, "ramp": args.ramp, "iterations": args.iterations,
+              "formulas": args.formulas, "url": args.url or "local"}
+    report = build_report(recorder, duration, config)
+    print(format_report(report))
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"JSON report written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
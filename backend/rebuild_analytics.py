@@ -0,0 +1,12 @@
+"""Rebuild materialized fleet analytics from the saved submissions.
+
+Run from the backend directory: python rebuild_analytics.py
+"""
+
+import json
+
+from app.services import onboarding_service
+
+result = onboarding_service.rebuild_analytics()
+print(json.dumps(result, indent=2))
+print("Aggregates were consistent" if result["consistent"] else "Aggregates drifted and were rebuilt")
@@ -0,0 +1,17 @@
+"""Shared pytest fixtures."""
+
+import pytest
+
+from app.services import analytics_service, onboarding_service, readings_service, search_service
+
+
+@pytest.fixture
+def submissions_dir(tmp_path, monkeypatch):
+    """Point submission storage at a temporary directory."""
+    path = tmp_path / "submissions"
+    monkeypatch.setattr(onboarding_service, "SUBMISSIONS_DIR", path)
+    monkeypatch.setattr(analytics_service, "ANALYTICS_PATH", tmp_path / "analytics.json")
+    monkeypatch.setattr(analytics_service, "_summary_cache", None)
+    monkeypatch.setattr(readings_service, "READINGS_DIR", tmp_path / "readings")
+    monkeypatch.setattr(search_service, "SEARCH_DB_PATH", tmp_path / "search.db")
+    return path
@@ -0,0 +1,107 @@
+"""Tests for the incrementally maintained fleet analytics."""
+
+from app.services import analytics_service
+from app.services.onboarding_service import delete_submission, rebuild_analytics, save_submission
+
+
+def _validated(plant_name, asset_types=("boiler",), formulas=("temperature * 0.95",), template=""):
+    return {
+        "plant": {"name": plant_name, "address": "123 Main St", "manager_email": "admin@test.com"},
+        "template_name": template,
+        "assets": [{"name": f"{t}_{i}", "display_name": t.title(), "type": t} for i, t in enumerate(asset_types)],
+        "parameters": [
+            {"name": "temperature", "enabled": True},
+            {"name": "pressure", "enabled": False},
+        ],
+        "formulas": [{"parameter_name": f"calc_{i}", "expression": e} for i, e in enumerate(formulas)],
+    }
+
+
+class TestContribution:
+    def test_counts_each_key_once_per_plant(self):
+        result = analytics_service.contribution(_validated("A", asset_types=("boiler", "boiler", "kiln")))
+        assert result["asset_types"] == {"boiler", "kiln"}
+
+    def test_ignores_disabled_parameters(self):
+        result = analytics_service.contribution(_validated("A"))
+        assert result["parameters"] == {"temperature"}
+
+    def test_empty_template_not_counted(self):
+        assert analytics_service.contribution(_validated("A"))["templates"] == set()
+
+
+class TestIncrementalAggregates:
+    def test_save_increments(self, submissions_dir):
+        save_submission(_validated("A", template="cement"))
+        save_submission(_validated("B", asset_types=("kiln",)))
+        summary = analytics_service.get_summary()
+        assert summary["total_plants"] == 2
+        assert summary["plants_per_asset_type"] == {"boiler": 1, "kiln": 1}
+        assert summary["parameter_enabled_counts"] == {"temperature": 2}
+        assert summary["top_formulas"] == [{"expression": "temperature * 0.95", "count": 2}]
+        assert summary["template_usage"] == {"cement": 1}
+
+    def test_upsert_replaces_contribution(self, submissions_dir):
+        save_submission(_validated("A"))
+        save_submission(_validated("A", asset_types=("turbine",), formulas=()))
+        summary = analytics_service.get_summary()
+        assert summary["total_plants"] == 1
+        assert summary["plants_per_asset_type"] == {"turbine": 1}
+        assert summary["top_formulas"] == []
+
+    def test_delete_decrements(self, submissions_dir):
+        meta = save_submission(_validated("A"))
+        save_submission(_validated("B", asset_types=("kiln",)))
+        delete_submission(meta["id"])
+        summary = analytics_service.get_summary()
+        assert summary["total_plants"] == 1
+        assert summary["plants_per_asset_type"] == {"kiln": 1}
+
+    def test_top_formulas_ordering_and_limit(self, submissions_dir):
+        save_submission(_validated("A", formulas=("a + b", "c * 2")))
+        save_submission(_validated("B", formulas=("c * 2",)))
+        summary = analytics_service.get_summary(top=1)
+        assert summary["top_formulas"] == [{"expression": "c * 2", "count": 2}]
+
+
+class TestRebuild:
+    def test_rebuild_matches_incremental(self, submissions_dir):
+        save_submission(_validated("A", template="cement"))
+        meta = save_submission(_validated("B", asset_types=("kiln",)))
+        save_submission(_validated("A", asset_types=("turbine",)))
+        delete_submission(meta["id"])
+        result = rebuild_analytics()
+        assert result["consistent"] is True
+        assert result["summary"]["total_plants"] == 1
+
+    def test_rebuild_repairs_drift(self, submissions_dir):
+        save_submission(_validated("A"))
+        analytics_service.update(None, _validated("Ghost", asset_types=("kiln",)))
+        result = rebuild_analytics()
+        assert result["consistent"] is False
+        assert result["summary"]["plants_per_asset_type"] == {"boiler": 1}
+
+    def test_built_lazily_for_existing_records(self, submissions_dir, monkeypatch):
+        save_submission(_validated("A"))
+        analytics_service.ANALYTICS_PATH.unlink()
+        monkeypatch.setattr(analytics_service, "_summary_cache", None)
+        save_submission(_validated("B"))
+        assert analytics_service.get_summary()["total_plants"] == 2
+
+    def test_rebuild_skips_unreadable_records(self, submissions_dir):
+        save_submission(_validated("A"))
+        corrupt = save_submission(_validated("B"))
+        missing = save_submission(_validated("C"))
+        (next(submissions_dir.glob(f"{corrupt['id']}_*")) / "record.json").write_text("{", encoding="utf-8")
+        (next(submissions_dir.glob(f"{missing['id']}_*")) / "formulas.json").unlink()
+        result = rebuild_analytics()
+        assert result["summary"]["total_plants"] == 1
+
+    def test_corrupt_file_triggers_rebuild(self, submissions_dir, monkeypatch):
+        save_submission(_validated("A"))
+        save_submission(_validated("B"))
+        analytics_service.ANALYTICS_PATH.write_text('{"plants": 2, "asset', encoding="utf-8")
+        monkeypatch.setattr(analytics_service, "_summary_cache", None)
+        assert analytics_service.is_built() is False
+        save_submission(_validated("C"))
+        assert analytics_service.get_summary()["total_plants"] == 3
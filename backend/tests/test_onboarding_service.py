@@ -1,7 +1,24 @@
 """Tests for the onboarding service and asset validators."""
 
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
 import pytest
-from app.services.onboarding_service import validate_payload
+from pydantic import ValidationError
+
+from app.services.onboarding_service import (
+    StaleSubmissionError,
+    content_hash,
+    delete_submission,
+    get_submission,
+    list_submissions,
+    parse_fields,
+    parse_payload,
+    save_submission,
+    validate_onboarding,
+    validate_payload,
+)
 from app.utils.validators import check_duplicate_assets
 
 
@@ -117,3 +134,225 @@ class TestValidatePayload:
         payload = self._make_payload()
         result = validate_payload(payload)
         assert set(result.keys()) == {"plant", "assets", "parameters", "formulas"}
+
+
+class TestValidateOnboarding:
+    def _body(self, **overrides):
+        return json.dumps(TestValidatePayload()._make_payload(**overrides)).encode("utf-8")
+
+    def test_parses_raw_bytes(self):
+        payload = parse_payload(self._body())
+        assert payload.plant.name == "Test Plant"
+        assert payload.assets[0].type.value == "boiler"
+
+    def test_invalid_body_raises(self):
+        with pytest.raises(ValidationError):
+            parse_payload(b'{"plant": {}}')
+
+    def test_empty_assets_rejected_by_schema(self):
+        with pytest.raises(ValidationError):
+            parse_payload(self._body(assets=[]))
+
+    def test_result_is_json_ready(self):
+        result = validate_onboarding(parse_payload(self._body()))
+        assert set(result.keys()) == {"plant", "template_name", "assets", "parameters", "formulas"}
+        assert result["assets"][0]["type"] == "boiler"
+        assert json.loads(json.dumps(result)) == result
+
+    def test_autofills_depends_on(self):
+        result = validate_onboarding(parse_payload(self._body()))
+        assert result["formulas"][0]["depends_on"] == ["temperature"]
+
+    def test_duplicate_assets_raises(self):
+        payload = parse_payload(self._body(assets=[
+            {"name": "boiler_1", "display_name": "B1", "type": "boiler"},
+            {"name": "Boiler_1", "display_name": "B2", "type": "boiler"},
+        ]))
+        with pytest.raises(ValueError, match="Duplicate"):
+            validate_onboarding(payload)
+
+    def test_matches_dict_path(self):
+        body = self._body()
+        typed = validate_onboarding(parse_payload(body))
+        from_dicts = validate_payload(parse_payload(body).model_dump())
+        assert typed == json.loads(json.dumps(from_dicts))
+
+
+def _validated(plant_name="Test Plant"):
+    return {
+        "plant": {"name": plant_name, "address": "123 Main St", "manager_email": "admin@test.com"},
+        "template_name": "",
+        "assets": [{"name": "boiler_1", "display_name": "Main Boiler", "type": "boiler"}],
+        "parameters": [{"name": "temperature", "unit": "°C"}],
+        "formulas": [{"parameter_name": "efficiency", "expression": "temperature * 0.95", "depends_on": ["temperature"]}],
+    }
+
+
+class TestSubmissionStorage:
+    def test_save_and_get_full_record(self, submissions_dir):
+        meta = save_submission(_validated())
+        record = get_submission(meta["id"])
+        assert record["plant_name"] == "Test Plant"
+        assert record["data"] == _validated()
+
+    def test_upsert_by_plant_name(self, submissions_dir):
+        first = save_submission(_validated())
+        second = save_submission(_validated("test plant"))
+        assert second["is_update"] is True
+        assert second["id"] == first["id"]
+        assert len(list_submissions()) == 1
+
+    def test_field_projection(self, submissions_dir):
+        meta = save_submission(_validated())
+        record = get_submission(meta["id"], ("plant", "assets"))
+        assert set(record["data"].keys()) == {"plant", "assets"}
+        assert record["data"]["assets"][0]["name"] == "boiler_1"
+
+    def test_projection_skips_unrequested_sections(self, submissions_dir):
+        meta = save_submission(_validated())
+        record_dir = next(submissions_dir.glob(f"{meta['id']}_*"))
+        (record_dir / "parameters.json").write_text("not json", encoding="utf-8")
+        record = get_submission(meta["id"], ("plant",))
+        assert record["data"]["plant"]["name"] == "Test Plant"
+
+    def test_delete(self, submissions_dir):
+        meta = save_submission(_validated())
+        assert delete_submission(meta["id"]) is True
+        assert get_submission(meta["id"]) is None
+        assert delete_submission(meta["id"]) is False
+
+    def test_plants_saved_back_to_back_get_distinct_ids(self, submissions_dir):
+        first = save_submission(_validated("Plant A"))
+        second = save_submission(_validated("Plant B"))
+        assert first["id"] != second["id"]
+        assert delete_submission(first["id"]) is True
+        assert get_submission(second["id"])["plant_name"] == "Plant B"
+
+    def test_lookup_matches_exact_id(self, submissions_dir):
+        meta = save_submission(_validated())
+        prefix = meta["id"].rsplit("_", 1)[0]
+        assert get_submission(prefix) is None
+        assert delete_submission(prefix) is False
+
+    def test_concurrent_resubmits_keep_one_record(self, submissions_dir):
+        def resubmit(i):
+            payload = _validated()
+            payload["template_name"] = f"rev {i}"
+            return save_submission(payload)
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(resubmit, range(32)))
+        assert len({r["id"] for r in results}) == 1
+        assert len(list_submissions()) == 1
+
+    def test_failed_write_leaves_no_partial_record(self, submissions_dir, monkeypatch):
+        real_replace = os.replace
+
+        def failing_replace(src, dst):
+            if str(dst).endswith("formulas.json"):
+                raise OSError("disk full")
+            real_replace(src, dst)
+
+        monkeypatch.setattr(os, "replace", failing_replace)
+        with pytest.raises(OSError):
+            save_submission(_validated())
+        assert list_submissions() == []
+        assert not list(submissions_dir.rglob("*.tmp"))
+
+    def test_migrates_legacy_flat_file(self, submissions_dir):
+        submissions_dir.mkdir(parents=True)
+        legacy = {
+            "id": "20240101_000000",
+            "submitted_at": "2024-01-01T00:00:00+00:00",
+            "updated_at": None,
+            "plant_name": "Old Plant",
+            "template_name": "",
+            "data": _validated("Old Plant"),
+        }
+        (submissions_dir / "20240101_000000_old_plant.json").write_text(json.dumps(legacy), encoding="utf-8")
+        record = get_submission("20240101_000000")
+        assert record == {**legacy, "content_hash": content_hash(legacy["data"])}
+        assert not list(submissions_dir.glob("*.json"))
+
+
+class TestContentHash:
+    def test_key_order_does_not_matter(self):
+        payload = _validated()
+        reordered = dict(reversed(list(payload.items())))
+        assert content_hash(payload) == content_hash(reordered)
+
+    def test_content_change_changes_hash(self):
+        changed = _validated()
+        changed["assets"][0]["display_name"] = "Other"
+        assert content_hash(_validated()) != content_hash(changed)
+
+    def test_unchanged_resubmit_skips_write(self, submissions_dir):
+        first = save_submission(_validated())
+        record_dir = next(submissions_dir.glob(f"{first['id']}_*"))
+        mtime = (record_dir / "record.json").stat().st_mtime_ns
+        second = save_submission(_validated())
+        assert second["unchanged"] is True
+        assert second["is_update"] is False
+        assert second["content_hash"] == first["content_hash"]
+        assert (record_dir / "record.json").stat().st_mtime_ns == mtime
+        assert get_submission(first["id"])["updated_at"] is None
+
+    def test_changed_resubmit_updates(self, submissions_dir):
+        first = save_submission(_validated())
+        changed = _validated()
+        changed["formulas"] = []
+        second = save_submission(changed)
+        assert second["unchanged"] is False
+        assert second["is_update"] is True
+        assert second["content_hash"] != first["content_hash"]
+
+    def test_conditional_submit_matching_hash(self, submissions_dir):
+        first = save_submission(_validated())
+        changed = _validated()
+        changed["formulas"] = []
+        assert save_submission(changed, expected_hash=first["content_hash"])["is_update"] is True
+
+    def test_conditional_submit_stale_hash_raises(self, submissions_dir):
+        save_submission(_validated())
+        with pytest.raises(StaleSubmissionError):
+            save_submission(_validated(), expected_hash="0" * 64)
+
+
+    def test_conditional_submit_wildcard(self, submissions_dir):
+        with pytest.raises(StaleSubmissionError):
+            save_submission(_validated(), expected_hash="*")
+        save_submission(_validated())
+        changed = _validated()
+        changed["formulas"] = []
+        assert save_submission(changed, expected_hash="*")["is_update"] is True
+
+    def test_legacy_record_without_hash(self, submissions_dir):
+        submissions_dir.mkdir(parents=True)
+        legacy = {
+            "id": "20240101_000000",
+            "submitted_at": "2024-01-01T00:00:00+00:00",
+            "updated_at": None,
+            "plant_name": "Test Plant",
+            "template_name": "",
+            "data": _validated(),
+        }
+        (submissions_dir / "20240101_000000_test_plant.json").write_text(json.dumps(legacy), encoding="utf-8")
+        record = get_submission("20240101_000000")
+        assert record["content_hash"] == content_hash(_validated())
+        assert "content_hash" not in get_submission("20240101_000000", ("plant",))
+        assert save_submission(_validated())["unchanged"] is True
+        changed = _validated()
+        changed["formulas"] = []
+        assert save_submission(changed, expected_hash=record["content_hash"])["is_update"] is True
+
+
+class TestParseFields:
+    def test_empty_means_all(self):
+        assert parse_fields("") == ("plant", "template_name", "assets", "parameters", "formulas")
+
+    def test_canonical_order(self):
+        assert parse_fields("formulas, plant") == ("plant", "formulas")
+
+    def test_unknown_field_raises(self):
+        with pytest.raises(ValueError, match="Unknown fields"):
+            parse_fields("plant,secrets")
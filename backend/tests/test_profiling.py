@@ -0,0 +1,109 @@
+"""Tests for the opt-in request profiling middleware."""
+
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.utils.profiling import ProfilingMiddleware, StackSampler
+
+
+def _busy_work():
+    deadline = time.perf_counter() + 0.05
+    total = 0
+    while time.perf_counter() < deadline:
+        total += 1
+    return total
+
+
+def _make_client(tmp_path, **options):
+    app = FastAPI()
+
+    @app.get("/work")
+    def work():
+        return {"n": _busy_work()}
+
+    app.add_middleware(ProfilingMiddleware, output_dir=tmp_path, **options)
+    return TestClient(app)
+
+
+class TestProfilingMiddleware:
+    def test_admin_header_writes_speedscope_profile(self, tmp_path):
+        client = _make_client(tmp_path, token="secret")
+        response = client.get("/work", headers={"X-Profile": "secret", "X-Request-ID": "req-1"})
+        assert response.status_code == 200
+        assert response.headers["x-profile-id"] == "req-1"
+        document = json.loads((tmp_path / "req-1.speedscope.json").read_text(encoding="utf-8"))
+        names = {frame["name"] for frame in document["shared"]["frames"]}
+        assert "_busy_work" in names
+        assert document["profiles"][0]["type"] == "sampled"
+
+    def test_wrong_token_not_profiled(self, tmp_path):
+        client = _make_client(tmp_path, token="secret")
+        response = client.get("/work", headers={"X-Profile": "guess"})
+        assert "x-profile-id" not in response.headers
+        assert list(tmp_path.iterdir()) == []
+
+    def test_no_header_not_profiled(self, tmp_path):
+        client = _make_client(tmp_path, token="secret")
+        client.get("/work")
+        assert list(tmp_path.iterdir()) == []
+
+    def test_sample_rate_profiles_without_header(self, tmp_path):
+        client = _make_client(tmp_path, sample_rate=1.0)
+        response = client.get("/work")
+        assert (tmp_path / f"{response.headers['x-profile-id']}.speedscope.json").exists()
+
+    def test_unsafe_request_id_replaced(self, tmp_path):
+        client = _make_client(tmp_path, sample_rate=1.0)
+        response = client.get("/work", headers={"X-Request-ID": "../../etc/passwd"})
+        profile_id = response.headers["x-profile-id"]
+        assert "/" not in profile_id
+        assert (tmp_path / f"{profile_id}.speedscope.json").exists()
+
+
+class TestStackSampler:
+    def test_idle_uvloop_thread_excluded(self):
+        uvloop = pytest.importorskip("uvloop")
+
+        def run_idle_loop():
+            with asyncio.Runner(loop_factory=uvloop.new_event_loop) as runner:
+                runner.run(asyncio.sleep(0.2))
+
+        loop_thread = threading.Thread(target=run_idle_loop)
+        loop_thread.start()
+        time.sleep(0.05)
+        sampler = StackSampler()
+        sampler.start()
+        _busy_work()
+        sampler.stop()
+        loop_thread.join()
+        assert loop_thread.ident not in sampler.samples
+        assert threading.get_ident() in sampler.samples
+
+    def test_busiest_thread_is_active_profile(self):
+        finished, release = threading.Event(), threading.Event()
+
+        def work():
+            _busy_work()
+            finished.set()
+            release.wait()
+
+        worker = threading.Thread(target=work, name="worker")
+        sampler = StackSampler()
+        sampler.start()
+        deadline = time.perf_counter() + 0.01
+        while time.perf_counter() < deadline:
+            pass
+        worker.start()
+        finished.wait()
+        sampler.stop()
+        document = sampler.to_speedscope("test")
+        release.set()
+        worker.join()
+        assert document["profiles"][document["activeProfileIndex"]]["name"] == "worker"
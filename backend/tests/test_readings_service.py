@@ -0,0 +1,122 @@
+"""Tests for the columnar readings storage."""
+
+import numpy as np
+import pytest
+
+from app.services import readings_service
+from app.services.readings_service import append_readings, delete_plant, list_series, page, read_range
+
+
+@pytest.fixture(autouse=True)
+def readings_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(readings_service, "READINGS_DIR", tmp_path / "readings")
+
+
+class TestAppendReadings:
+    def test_append_and_read_back(self):
+        result = append_readings("p1", "temperature", [1, 2, 3], [10.0, 20.0, 30.0])
+        assert result == {"appended": 3, "total": 3}
+        ts, vals = read_range("p1", "temperature")
+        assert ts.tolist() == [1, 2, 3]
+        assert vals.tolist() == [10.0, 20.0, 30.0]
+
+    def test_appends_accumulate(self):
+        append_readings("p1", "temperature", [1, 2], [1.0, 2.0])
+        result = append_readings("p1", "temperature", np.array([2, 5]), np.array([3.0, 4.0]))
+        assert result["total"] == 4
+
+    def test_length_mismatch_raises(self):
+        with pytest.raises(ValueError, match="same length"):
+            append_readings("p1", "temperature", [1, 2], [1.0])
+
+    def test_unsorted_batch_raises(self):
+        with pytest.raises(ValueError, match="non-decreasing"):
+            append_readings("p1", "temperature", [2, 1], [1.0, 2.0])
+
+    @pytest.mark.parametrize("bad", [float("nan"), float("inf"), float("-inf")])
+    def test_non_finite_value_raises(self, bad):
+        with pytest.raises(ValueError, match="finite"):
+            append_readings("p1", "temperature", [1, 2], [1.0, bad])
+        assert read_range("p1", "temperature")[0].size == 0
+
+    def test_batch_older_than_stored_raises(self):
+        append_readings("p1", "temperature", [10], [1.0])
+        with pytest.raises(ValueError, match="earlier"):
+            append_readings("p1", "temperature", [5], [1.0])
+
+    def test_append_repairs_uneven_columns(self):
+        append_readings("p1", "temperature", [1, 2], [1.0, 2.0])
+        series_dir = readings_service.READINGS_DIR / "p1" / "temperature"
+        with open(series_dir / readings_service.TIMESTAMP_FILE, "ab") as f:
+            f.write(np.array([3], dtype="<i8").tobytes())
+        with open(series_dir / readings_service.VALUE_FILE, "ab") as f:
+            f.write(b"\x00\x01")
+        result = append_readings("p1", "temperature", [4], [4.0])
+        assert result["total"] == 3
+        ts, vals = read_range("p1", "temperature")
+        assert ts.tolist() == [1, 2, 4]
+        assert vals.tolist() == [1.0, 2.0, 4.0]
+
+    def test_invalid_parameter_name_raises(self):
+        with pytest.raises(ValueError, match="Invalid parameter"):
+            append_readings("p1", "../escape", [1], [1.0])
+
+
+class TestReadRange:
+    def test_half_open_range(self):
+        append_readings("p1", "pressure", [10, 20, 30, 40], [1.0, 2.0, 3.0, 4.0])
+        ts, vals = read_range("p1", "pressure", start=20, end=40)
+        assert ts.tolist() == [20, 30]
+        assert vals.tolist() == [2.0, 3.0]
+
+    def test_returns_memory_mapped_views(self):
+        append_readings("p1", "pressure", [1, 2], [1.0, 2.0])
+        ts, vals = read_range("p1", "pressure", start=2)
+        assert isinstance(vals, np.memmap)
+        assert not vals.flags.writeable
+
+    def test_reads_past_torn_write(self):
+        append_readings("p1", "pressure", [1, 2], [1.0, 2.0])
+        series_dir = readings_service.READINGS_DIR / "p1" / "pressure"
+        with open(series_dir / readings_service.TIMESTAMP_FILE, "ab") as f:
+            f.write(np.array([3], dtype="<i8").tobytes())
+        with open(series_dir / readings_service.VALUE_FILE, "ab") as f:
+            f.write(b"\x00\x01")
+        ts, vals = read_range("p1", "pressure")
+        assert ts.tolist() == [1, 2]
+        assert vals.tolist() == [1.0, 2.0]
+
+    def test_missing_series_is_empty(self):
+        ts, vals = read_range("p1", "missing")
+        assert ts.size == 0 and vals.size == 0
+
+
+class TestPage:
+    def _pages(self, limit):
+        pages, start = [], None
+        while True:
+            ts, vals, start = page(*read_range("p1", "pressure", start=start), limit)
+            pages.append(ts.tolist())
+            if start is None:
+                return pages
+
+    def test_pages_do_not_split_a_timestamp(self):
+        append_readings("p1", "pressure", [1, 2, 3, 3, 3, 4], [1.0, 2.0, 3.0, 3.1, 3.2, 4.0])
+        assert self._pages(3) == [[1, 2], [3, 3, 3], [4]]
+
+    def test_run_longer_than_limit_advances(self):
+        append_readings("p1", "pressure", [5, 5, 5, 6], [1.0, 2.0, 3.0, 4.0])
+        assert self._pages(1) == [[5, 5, 5], [6]]
+
+    def test_under_limit_is_one_page(self):
+        append_readings("p1", "pressure", [5, 5, 5], [1.0, 2.0, 3.0])
+        assert self._pages(3) == [[5, 5, 5]]
+
+
+class TestSeriesLifecycle:
+    def test_list_and_delete(self):
+        append_readings("p1", "pressure", [1], [1.0])
+        append_readings("p1", "temperature", [1], [1.0])
+        assert list_series("p1") == ["pressure", "temperature"]
+        delete_plant("p1")
+        assert list_series("p1") == []
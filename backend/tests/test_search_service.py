@@ -0,0 +1,106 @@
+"""Tests for the full-text submission search index."""
+
+import pytest
+
+from app.services import search_service
+from app.services.onboarding_service import (
+    delete_submission,
+    rebuild_search_index,
+    save_submission,
+    search_submissions,
+)
+
+
+def _validated(plant_name, address="12 Harbour Road", email="ops@example.com", assets=("Main Boiler",)):
+    return {
+        "plant": {"name": plant_name, "address": address, "manager_email": email},
+        "template_name": "",
+        "assets": [
+            {"name": f"asset_{i}", "display_name": name, "type": "boiler"}
+            for i, name in enumerate(assets)
+        ],
+        "parameters": [],
+        "formulas": [],
+    }
+
+
+class TestSearch:
+    def test_partial_plant_name(self, submissions_dir):
+        meta = save_submission(_validated("Riverside Cement Works"))
+        save_submission(_validated("Hilltop Sugar Mill"))
+        results = search_submissions("cement")
+        assert [r["id"] for r in results] == [meta["id"]]
+
+    def test_substring_inside_word(self, submissions_dir):
+        save_submission(_validated("Riverside Cement Works"))
+        assert len(search_submissions("ersid")) == 1
+
+    def test_address_email_and_asset(self, submissions_dir):
+        save_submission(_validated("Plant A", address="7 Quarry Lane", email="asha@kiln.co", assets=("Rotary Kiln",)))
+        assert len(search_submissions("quarry")) == 1
+        assert len(search_submissions("asha@")) == 1
+        assert len(search_submissions("rotary")) == 1
+
+    def test_all_terms_must_match(self, submissions_dir):
+        save_submission(_validated("Riverside Cement Works"))
+        save_submission(_validated("Riverside Sugar Mill"))
+        results = search_submissions("riverside sugar")
+        assert [r["plant_name"] for r in results] == ["Riverside Sugar Mill"]
+
+    def test_plant_name_ranks_above_assets(self, submissions_dir):
+        save_submission(_validated("Alpha Plant", assets=("Turbine Hall",)))
+        save_submission(_validated("Turbine Works"))
+        results = search_submissions("turbine")
+        assert results[0]["plant_name"] == "Turbine Works"
+        assert results[0]["score"] > results[1]["score"]
+
+    def test_short_query_raises(self, submissions_dir):
+        with pytest.raises(ValueError, match="at least one term"):
+            search_submissions("ab")
+
+    def test_quotes_are_escaped(self, submissions_dir):
+        save_submission(_validated("Plant A"))
+        assert search_submissions('"plant') == []
+
+
+class TestIndexMaintenance:
+    def test_update_reindexes(self, submissions_dir):
+        save_submission(_validated("Plant A", address="Old Street"))
+        save_submission(_validated("Plant A", address="New Avenue"))
+        assert search_submissions("old street") == []
+        assert len(search_submissions("avenue")) == 1
+
+    def test_delete_removes(self, submissions_dir):
+        meta = save_submission(_validated("Plant A"))
+        delete_submission(meta["id"])
+        assert search_submissions("plant") == []
+
+    def test_built_from_existing_records(self, submissions_dir):
+        save_submission(_validated("Plant A"))
+        search_service.SEARCH_DB_PATH.unlink()
+        assert len(search_submissions("plant")) == 1
+
+    def test_rebuild_counts_records(self, submissions_dir):
+        save_submission(_validated("Plant A"))
+        save_submission(_validated("Plant B"))
+        assert rebuild_search_index() == 2
+
+    def test_rebuild_skips_unreadable_records(self, submissions_dir):
+        save_submission(_validated("Plant A"))
+        broken = save_submission(_validated("Plant B"))
+        (next(submissions_dir.glob(f"{broken['id']}_*")) / "assets.json").write_text("[", encoding="utf-8")
+        search_service.SEARCH_DB_PATH.unlink()
+        save_submission(_validated("Plant C"))
+        assert sorted(r["plant_name"] for r in search_submissions("plant")) == ["Plant A", "Plant C"]
+
+    def test_failed_rebuild_keeps_previous_index(self, submissions_dir):
+        save_submission(_validated("Plant A"))
+
+        def failing_records():
+            yield {"id": "x", "data": {}}
+            raise RuntimeError("disk error")
+
+        with pytest.raises(RuntimeError):
+            search_service.rebuild(failing_records())
+        assert len(search_submissions("plant")) == 1
+        assert not list(search_service.SEARCH_DB_PATH.parent.glob("*.tmp"))
@@ -0,0 +1,72 @@
+"""Tests for the registry-driven unit conversion service."""
+
+import numpy as np
+import pytest
+
+from app.services.parameter_service import get_all_parameters
+from app.services.unit_service import UNITS, build_table, convert, get_conversion_table
+
+
+class TestBuildTable:
+    def test_pairs_within_dimension(self):
+        table = build_table("MT", ["MT", "kg", "ton"])
+        assert table["unit"] == "MT"
+        assert table["factors"][("MT", "kg")] == (1000.0, 0.0)
+        assert len(table["factors"]) == 6
+
+    def test_skips_mismatched_dimensions(self):
+        table = build_table("kg/kWh", ["kg/kWh", "g/kWh", "kg/MT"])
+        assert ("kg/kWh", "g/kWh") in table["factors"]
+        assert ("kg/kWh", "kg/MT") not in table["factors"]
+
+    def test_every_registry_unit_is_known(self):
+        for param in get_all_parameters():
+            for unit in [param["unit"], *param.get("unit_options", [])]:
+                assert unit in UNITS, f"{param['name']}: {unit}"
+
+
+class TestConvert:
+    def test_scale_conversion(self):
+        result = convert("coal_consumption", [1.0, 2.5], "kg")
+        np.testing.assert_allclose(result, [0.001, 0.0025])
+
+    def test_affine_temperature(self):
+        result = convert("feedwater_temperature", np.array([32.0, 212.0]), "°F")
+        np.testing.assert_allclose(result, [0.0, 100.0], atol=1e-9)
+
+    def test_common_temperature_points_are_exact(self):
+        assert convert("feedwater_temperature", [0.0, 100.0, -40.0], "°C", "°F").tolist() == [32.0, 212.0, -40.0]
+        assert convert("feedwater_temperature", [32.0, 212.0, -40.0], "°F", "°C").tolist() == [0.0, 100.0, -40.0]
+        assert convert("feedwater_temperature", [0.0], "°C", "K").tolist() == [273.15]
+
+    def test_explicit_target_unit(self):
+        result = convert("feedwater_temperature", [0.0], "°C", "K")
+        np.testing.assert_allclose(result, [273.15])
+
+    def test_round_trip(self):
+        values = np.linspace(-40, 500, 50)
+        there = convert("feedwater_temperature", values, "°C", "°F")
+        back = convert("feedwater_temperature", there, "°F", "°C")
+        np.testing.assert_allclose(back, values)
+
+    def test_same_unit_returns_input(self):
+        values = np.array([1.0, 2.0])
+        assert convert("coal_consumption", values, "MT") is values
+
+    def test_unknown_parameter_raises(self):
+        with pytest.raises(ValueError, match="Unknown parameter"):
+            convert("not_a_param", [1.0], "kg")
+
+    def test_unsupported_unit_raises(self):
+        with pytest.raises(ValueError, match="Cannot convert"):
+            convert("coal_consumption", [1.0], "°C")
+
+
+class TestGetConversionTable:
+    def test_known_parameter(self):
+        table = get_conversion_table("coal_gcv")
+        assert table["unit"] == "kcal/kg"
+        assert ("MJ/kg", "kcal/kg") in table["factors"]
+
+    def test_unknown_parameter(self):
+        assert get_conversion_table("nope") is None